@@ -0,0 +1,137 @@
+"""
+iOS Mount GUI - App Backups
+Copies every file-sharing app's Documents folder through temporary mounts
+"""
+
+import os
+import re
+import shlex
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.commands import ifuse_device_args, parse_app_list, run_command
+from backend.pairing import mount_with_pairing
+from backend.transfer import copy_tree
+
+# Apps mounted and copied at the same time
+DEFAULT_CONCURRENCY = 2
+# Files in flight per app; all temporary mounts share the device's I/O scheduler queue
+APP_WORKERS = 2
+
+def installed_apps(udid=None, run=run_command):
+    """(display_name, bundle_id) pairs from ifuse --list-apps, or None on failure"""
+    device_arg = f" -u {shlex.quote(udid)}" if udid else ""
+    result = run(f"ifuse{device_arg} --list-apps")
+    if not result["success"]:
+        return None
+    return parse_app_list(result["stdout"])
+
+def app_mount_command(mount_point, bundle_id, udid=None):
+    """Read-only ifuse command for one app's Documents folder"""
+    return f"ifuse{ifuse_device_args(udid)} --documents {shlex.quote(bundle_id)} {shlex.quote(mount_point)} -o ro"
+
+def paired_mounter(cache, udid=None, run=run_command):
+    """mount(command) callable that goes through the pairing cache"""
+    def mount(command):
+        steps = mount_with_pairing(command, run, cache, udid)
+        return {"success": steps[-1]["result"]["success"], "steps": steps}
+    return mount
+
+def _safe_name(bundle_id):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", bundle_id)
+
+class AppBackup:
+    """Back up a list of apps with at most concurrency apps mounted at once
+
+    Each app is mounted read-only under its own temporary directory, copied
+    into dest/<bundle_id> with copy_tree, and unmounted again. A failure is
+    recorded in that app's result and the remaining apps carry on.
+    progress(state) receives the state() snapshot as apps move along.
+    """
+
+    def __init__(self, bundle_ids, dest, mount, udid=None, concurrency=DEFAULT_CONCURRENCY,
+                 workers=APP_WORKERS, run=run_command, progress=None):
+        self.dest = dest
+        self.mount = mount
+        self.udid = udid
+        self.concurrency = max(1, concurrency)
+        self.workers = workers
+        self.run = run
+        self.progress = progress
+        self.lock = threading.Lock()
+        # ifuse mounts are serialised so a pairing prompt is only negotiated once
+        self.mount_lock = threading.Lock()
+        self.apps = {
+            bundle_id: {"bundle_id": bundle_id, "status": "pending", "files": 0, "bytes": 0, "error": None}
+            for bundle_id in bundle_ids
+        }
+
+    def state(self):
+        with self.lock:
+            apps = [dict(app) for app in self.apps.values()]
+        finished = [app for app in apps if app["status"] in ("done", "failed")]
+        return {
+            "done": len(finished),
+            "total": len(apps),
+            "bytes": sum(app["bytes"] for app in apps),
+            "apps": apps,
+        }
+
+    def _update(self, bundle_id, **fields):
+        with self.lock:
+            self.apps[bundle_id].update(fields)
+        if self.progress:
+            self.progress(self.state())
+
+    def _add_bytes(self, bundle_id, n):
+        with self.lock:
+            self.apps[bundle_id]["bytes"] += n
+        if self.progress:
+            self.progress(self.state())
+
+    def backup_app(self, bundle_id):
+        started = time.time()
+        mount_point = tempfile.mkdtemp(prefix=f"ios-backup-{_safe_name(bundle_id)}-")
+        try:
+            self._update(bundle_id, status="mounting")
+            with self.mount_lock:
+                mounted = self.mount(app_mount_command(mount_point, bundle_id, self.udid))
+            if not mounted["success"]:
+                step = mounted["steps"][-1]["result"] if "steps" in mounted else mounted
+                error = (step.get("stderr") or step.get("stdout") or "Mount failed").strip()
+                self._update(bundle_id, status="failed", error=error)
+                return
+            try:
+                self._update(bundle_id, status="copying")
+                results = copy_tree(mount_point, os.path.join(self.dest, _safe_name(bundle_id)), self.workers,
+                                    progress=lambda n: self._add_bytes(bundle_id, n))
+            finally:
+                self.run(f"fusermount -u {shlex.quote(mount_point)}")
+            failed = [r for r in results if not r["success"]]
+            self._update(
+                bundle_id,
+                status="failed" if failed else "done",
+                files=len(results) - len(failed),
+                bytes=sum(r["bytes"] for r in results if r["success"]),
+                failed_files=[{"source": r["source"], "error": r.get("error")} for r in failed],
+                error=f"{len(failed)} file(s) failed" if failed else None,
+                duration=time.time() - started,
+            )
+        except Exception as e:
+            self._update(bundle_id, status="failed", error=str(e))
+        finally:
+            try:
+                os.rmdir(mount_point)
+            except OSError:
+                pass
+
+    def run_all(self):
+        """Back up every app and return the summary"""
+        os.makedirs(self.dest, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(self.backup_app, list(self.apps)))
+        state = self.state()
+        failed = [app["bundle_id"] for app in state["apps"] if app["status"] == "failed"]
+        return {"success": not failed, "dest": self.dest, "failed": failed, **state}
@@ -0,0 +1,114 @@
+"""
+iOS Mount GUI - Command Helpers
+Subprocess runner and output parsers shared by every frontend
+"""
+
+import shlex
+import subprocess
+import time
+
+from backend import imobiledevice, metrics, tracing
+from backend.iosched import device_source
+
+def run_command(command, timeout=30):
+    """Execute a shell command and return result"""
+    with tracing.span(metrics.command_name(command), "subprocess", command=command):
+        return _run_command(command, timeout)
+
+def _run_command(command, timeout):
+    start = time.perf_counter()
+    tracing.instant("subprocess start", "subprocess", command=command)
+    try:
+        result = subprocess.run(
+            command,
+            shell=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        metrics.record_command(command, time.perf_counter() - start, result.returncode == 0)
+        tracing.instant("subprocess exit", "subprocess", command=command, code=result.returncode)
+        return {
+            "success": result.returncode == 0,
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+            "code": result.returncode
+        }
+    except subprocess.TimeoutExpired:
+        metrics.record_command(command, time.perf_counter() - start, False, timed_out=True)
+        tracing.instant("subprocess timeout", "subprocess", command=command)
+        return {
+            "success": False,
+            "stdout": "",
+            "stderr": "Command timed out",
+            "code": -1
+        }
+    except Exception as e:
+        metrics.record_command(command, time.perf_counter() - start, False)
+        return {
+            "success": False,
+            "stdout": "",
+            "stderr": str(e),
+            "code": -1
+        }
+
+def run_output(command):
+    """run_command reduced to (success, stdout)"""
+    result = run_command(command)
+    return result["success"], result["stdout"]
+
+def ifuse_device_args(udid=None):
+    """ifuse arguments that pin a mount to udid and name the device in the mount table
+
+    The I/O scheduler keys its queues on the mount's fsname, so each
+    device's mounts share one queue and bulk cap.
+    """
+    if not udid:
+        return ""
+    return f" -u {shlex.quote(udid)} -o fsname={shlex.quote(device_source(udid))}"
+
+def list_udids():
+    """UDIDs of attached devices"""
+    binding = imobiledevice.get_binding()
+    if binding:
+        return binding.device_list()
+    result = run_command("idevice_id -l")
+    return result["stdout"].split() if result["success"] else []
+
+def validate_pairing(udid=None, run=run_command):
+    """idevicepair validate, answered in-process when the bindings are available"""
+    binding = imobiledevice.get_binding()
+    if binding:
+        result = binding.validate_pairing(udid)
+        if result is not None:
+            return result
+    device_arg = f" -u {udid}" if udid else ""
+    return run(f"idevicepair{device_arg} validate")
+
+def parse_app_list(output):
+    """Parse ifuse --list-apps output into (display_name, bundle_id) pairs"""
+    apps = []
+    for line in output.split('\n'):
+        if not line.strip():
+            continue
+
+        bundle_id = None
+        display_name = line.strip()
+
+        if '(' in line and ')' in line:
+            bundle_id = line.split('(')[1].split(')')[0]
+        elif line.startswith('"') and '","' in line:
+            parts = [p.strip('"').strip() for p in line.split('","')]
+            if len(parts) >= 3:
+                bundle_id = parts[0]
+                app_name = parts[2]
+                display_name = f"{app_name} ({bundle_id})"
+            elif len(parts) >= 1:
+                bundle_id = parts[0]
+        else:
+            bundle_id = line.strip()
+
+        # ifuse prints a CSV header row before the apps
+        if bundle_id and bundle_id != "CFBundleIdentifier":
+            apps.append((display_name, bundle_id))
+    return apps
@@ -0,0 +1,176 @@
+"""
+iOS Mount GUI - Archive Export
+Streams a mounted tree into a zip or tar without staging a local copy
+"""
+
+import os
+import queue
+import tarfile
+import threading
+import zipfile
+
+from backend.iosched import BULK, open_scheduled
+from backend.transfer import CHUNK_SIZE
+
+# Media that is already compressed gains nothing from deflate
+STORED_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".heic", ".heif", ".webp",
+    ".mp4", ".mov", ".m4v", ".m4a", ".mp3", ".aac",
+    ".zip", ".gz", ".bz2", ".xz", ".7z", ".ipa", ".pdf"
+}
+FORMATS = ("zip", "tar")
+# Chunks the reader thread may run ahead of the compressor
+READ_AHEAD_CHUNKS = 16
+
+class _ChunkSink:
+    """Write-only, unseekable file object that collects archive output"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+def compress_type_for(name):
+    """Pick the zip compression for a file based on its extension"""
+    if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def _walk_files(root):
+    """Yield (full_path, archive_name) for every regular file under root"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            full_path = os.path.join(dirpath, name)
+            if os.path.isfile(full_path) and not os.path.islink(full_path):
+                yield full_path, os.path.relpath(full_path, root)
+
+def _read_ahead(root):
+    """Read files on a background thread so USB reads overlap compression"""
+    items = queue.Queue(maxsize=READ_AHEAD_CHUNKS)
+    stop = threading.Event()
+
+    def reader():
+        try:
+            for full_path, arcname in _walk_files(root):
+                try:
+                    f = open_scheduled(full_path, 'rb', BULK)
+                except OSError:
+                    continue
+                with f:
+                    items.put(("file", full_path, arcname))
+                    while not stop.is_set():
+                        chunk = f.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        items.put(("data", chunk, None))
+                    items.put(("end", None, None))
+                if stop.is_set():
+                    return
+        except Exception as e:
+            items.put(("error", e, None))
+        items.put(("done", None, None))
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value, extra = items.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield kind, value, extra
+    finally:
+        stop.set()
+        # Unblock the reader if the consumer stopped early
+        while thread.is_alive():
+            try:
+                items.get_nowait()
+            except queue.Empty:
+                thread.join(0.05)
+
+def _iter_zip(root):
+    sink = _ChunkSink()
+    # Not a context manager: an abandoned stream must not try to finish the
+    # central directory while an entry is still open
+    archive = zipfile.ZipFile(sink, 'w', allowZip64=True)
+    entry = None
+    for kind, value, arcname in _read_ahead(root):
+        if kind == "file":
+            info = zipfile.ZipInfo.from_file(value, arcname)
+            info.compress_type = compress_type_for(arcname)
+            entry = archive.open(info, 'w', force_zip64=True)
+        elif kind == "data":
+            entry.write(value)
+        elif kind == "end":
+            entry.close()
+        yield from sink.drain()
+    archive.close()
+    yield from sink.drain()
+
+def _tar_header(full_path, arcname):
+    st = os.stat(full_path)
+    info = tarfile.TarInfo(arcname)
+    info.size = st.st_size
+    info.mtime = int(st.st_mtime)
+    info.mode = st.st_mode & 0o7777
+    return info, info.tobuf(tarfile.PAX_FORMAT)
+
+def _iter_tar(root):
+    # Headers are written up front from stat so file bodies never buffer
+    written = 0
+    remaining = 0
+    size = 0
+    for kind, value, arcname in _read_ahead(root):
+        if kind == "file":
+            info, header = _tar_header(value, arcname)
+            size = remaining = info.size
+            written += len(header)
+            yield header
+        elif kind == "data":
+            chunk = value[:remaining]
+            remaining -= len(chunk)
+            written += len(chunk)
+            yield chunk
+        elif kind == "end":
+            # Pad files that shrank while reading, then to the block size
+            padding = tarfile.NUL * (remaining + (-size % tarfile.BLOCKSIZE))
+            written += len(padding)
+            yield padding
+    trailer = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+    written += len(trailer)
+    yield trailer + tarfile.NUL * (-written % tarfile.RECORDSIZE)
+
+def iter_archive(root, fmt="zip"):
+    """Yield the archive of root as a stream of byte chunks"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported archive format: {fmt}")
+    if fmt == "zip":
+        return _iter_zip(root)
+    return _iter_tar(root)
+
+def export_archive(root, dest_path, fmt="zip", progress=None):
+    """Write the archive of root to dest_path and return its size"""
+    written = 0
+    with open(dest_path, 'wb') as f:
+        for chunk in iter_archive(root, fmt):
+            f.write(chunk)
+            written += len(chunk)
+            if progress:
+                progress(len(chunk))
+    return written
@@ -0,0 +1,245 @@
+"""
+iOS Mount GUI - libimobiledevice Bindings
+In-process device queries through ctypes, with the CLI tools as fallback
+"""
+
+import ctypes
+import ctypes.util
+import os
+import plistlib
+import threading
+from pathlib import Path
+
+from backend import tracing
+
+# Set to 0 to always use the idevice* command line tools
+NATIVE_ENV = "IOS_MOUNT_NATIVE"
+BUNDLED_LIBS = Path(__file__).resolve().parent.parent / "bundled" / "libs"
+# Loaded in dependency order so the bundled sonames resolve each other
+LIBRARIES = ("libplist-2.0.so.4", "libusbmuxd-2.0.so.7", "libimobiledevice-1.0.so.6")
+LABEL = b"ios-mount-gui"
+
+# lockdownd_error_t values that idevicepair reports specially
+LOCKDOWN_E_PAIRING_FAILED = -4
+LOCKDOWN_E_PASSWORD_PROTECTED = -17
+LOCKDOWN_E_USER_DENIED_PAIRING = -18
+LOCKDOWN_E_PAIRING_DIALOG_RESPONSE_PENDING = -19
+LOCKDOWN_E_INVALID_HOST_ID = -21
+LOCKDOWN_E_MISSING_PAIR_RECORD = -29
+NOT_PAIRED_ERRORS = (LOCKDOWN_E_PAIRING_FAILED, LOCKDOWN_E_INVALID_HOST_ID, LOCKDOWN_E_MISSING_PAIR_RECORD)
+
+class LockdownError(Exception):
+    """A libimobiledevice call returned a non-zero error code"""
+
+    def __init__(self, call, code):
+        super().__init__(f"{call} failed with error {code}")
+        self.call = call
+        self.code = code
+
+def _load_library(name):
+    """Load a bundled library, falling back to the system copy"""
+    bundled = BUNDLED_LIBS / name
+    if bundled.exists():
+        return ctypes.CDLL(str(bundled), mode=ctypes.RTLD_GLOBAL)
+    found = ctypes.util.find_library(name.split(".so")[0][3:])
+    return ctypes.CDLL(found or name, mode=ctypes.RTLD_GLOBAL)
+
+def _declare(lib, plist):
+    """Prototypes for the calls used here, so pointers are not truncated to int"""
+    vp, pvp, cp = ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p), ctypes.c_char_p
+    pcp = ctypes.POINTER(ctypes.c_char_p)
+    prototypes = {
+        lib.idevice_get_device_list: (ctypes.c_int, [ctypes.POINTER(pcp), ctypes.POINTER(ctypes.c_int)]),
+        lib.idevice_device_list_free: (ctypes.c_int, [pcp]),
+        lib.idevice_new: (ctypes.c_int, [pvp, cp]),
+        lib.idevice_free: (ctypes.c_int, [vp]),
+        lib.lockdownd_client_new_with_handshake: (ctypes.c_int, [vp, pvp, cp]),
+        lib.lockdownd_client_free: (ctypes.c_int, [vp]),
+        lib.lockdownd_get_value: (ctypes.c_int, [vp, cp, cp, pvp]),
+        lib.lockdownd_get_device_name: (ctypes.c_int, [vp, ctypes.POINTER(ctypes.c_void_p)]),
+        plist.plist_to_bin: (ctypes.c_int, [vp, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_uint32)]),
+        plist.plist_free: (None, [vp]),
+    }
+    for func, (restype, argtypes) in prototypes.items():
+        func.restype = restype
+        func.argtypes = argtypes
+
+class LockdownSession:
+    """An idevice handle and lockdown client kept open for one device"""
+
+    def __init__(self, lib, udid):
+        self.lib = lib
+        self.udid = udid
+        self.lock = threading.Lock()
+        self.device = ctypes.c_void_p()
+        self.client = ctypes.c_void_p()
+        code = lib.idevice_new(ctypes.byref(self.device), udid.encode())
+        if code:
+            raise LockdownError("idevice_new", code)
+        code = lib.lockdownd_client_new_with_handshake(self.device, ctypes.byref(self.client), LABEL)
+        if code:
+            lib.idevice_free(self.device)
+            raise LockdownError("lockdownd_client_new_with_handshake", code)
+
+    def close(self):
+        with self.lock:
+            if self.client:
+                self.lib.lockdownd_client_free(self.client)
+                self.client = ctypes.c_void_p()
+            if self.device:
+                self.lib.idevice_free(self.device)
+                self.device = ctypes.c_void_p()
+
+class IMobileDevice:
+    """Device list, lockdown values and pairing checks without fork/exec
+
+    lib and plist are the loaded libimobiledevice and libplist; tests can
+    pass stand-ins exposing the same function names.
+    """
+
+    def __init__(self, lib, plist, free=None):
+        self.lib = lib
+        self.plist = plist
+        # Buffers returned by the libraries are released with their free()
+        self.free = free or getattr(plist, "plist_mem_free", None) or ctypes.CDLL(None).free
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls):
+        plist, _, lib = (_load_library(name) for name in LIBRARIES)
+        _declare(lib, plist)
+        return cls(lib, plist)
+
+    def device_list(self):
+        """UDIDs of attached devices, closing sessions for devices that left"""
+        devices = ctypes.POINTER(ctypes.c_char_p)()
+        count = ctypes.c_int()
+        code = self.lib.idevice_get_device_list(ctypes.byref(devices), ctypes.byref(count))
+        if code:
+            # No usbmuxd or no devices; the CLI reports the same as an empty list
+            udids = []
+        else:
+            udids = [devices[i].decode() for i in range(count.value)]
+            self.lib.idevice_device_list_free(devices)
+        with self.lock:
+            for udid in [u for u in self.sessions if u not in udids]:
+                self.sessions.pop(udid).close()
+        return udids
+
+    def session(self, udid):
+        with self.lock:
+            session = self.sessions.get(udid)
+            if session is None:
+                session = self.sessions[udid] = LockdownSession(self.lib, udid)
+            return session
+
+    def close(self, udid=None):
+        """Close one cached session, or all of them"""
+        with self.lock:
+            udids = list(self.sessions) if udid is None else [udid]
+            for key in udids:
+                session = self.sessions.pop(key, None)
+                if session:
+                    session.close()
+
+    def _call(self, udid, func):
+        """Run func(session), reopening the session once if the device dropped it"""
+        for attempt in (1, 2):
+            session = self.session(udid)
+            try:
+                with session.lock:
+                    return func(session)
+            except LockdownError:
+                self.close(udid)
+                if attempt == 2:
+                    raise
+
+    def _plist_to_python(self, node):
+        buf = ctypes.c_void_p()
+        length = ctypes.c_uint32()
+        self.plist.plist_to_bin(node, ctypes.byref(buf), ctypes.byref(length))
+        try:
+            return plistlib.loads(ctypes.string_at(buf, length.value))
+        finally:
+            self.free(buf)
+
+    def get_value(self, udid, key, domain=None):
+        """Lockdown value for key as a Python object, or None when unset"""
+        def query(session):
+            node = ctypes.c_void_p()
+            code = self.lib.lockdownd_get_value(
+                session.client, domain.encode() if domain else None, key.encode(), ctypes.byref(node)
+            )
+            if code:
+                raise LockdownError("lockdownd_get_value", code)
+            if not node:
+                return None
+            try:
+                return self._plist_to_python(node)
+            finally:
+                self.plist.plist_free(node)
+
+        with tracing.span("lockdownd_get_value", "native", key=key):
+            return self._call(udid, query)
+
+    def device_name(self, udid):
+        def query(session):
+            name = ctypes.c_void_p()
+            code = self.lib.lockdownd_get_device_name(session.client, ctypes.byref(name))
+            if code:
+                raise LockdownError("lockdownd_get_device_name", code)
+            try:
+                return ctypes.string_at(name).decode()
+            finally:
+                self.free(name)
+
+        with tracing.span("lockdownd_get_device_name", "native"):
+            return self._call(udid, query)
+
+    def validate_pairing(self, udid=None):
+        """idevicepair validate as a run_command-style result, or None if no device"""
+        if udid is None:
+            udids = self.device_list()
+            if not udids:
+                return None
+            udid = udids[0]
+        # A fresh handshake is the validation, so never answer from a cached session
+        self.close(udid)
+        try:
+            with tracing.span("lockdownd_handshake", "native"):
+                self.session(udid)
+        except LockdownError as e:
+            if e.call == "idevice_new":
+                return None
+            return {"success": False, "stdout": "", "stderr": pairing_message(udid, e.code), "code": e.code}
+        return {"success": True, "stdout": f"SUCCESS: Validated pairing with device {udid}\n", "stderr": "", "code": 0}
+
+def pairing_message(udid, code):
+    """The message idevicepair prints for a failed validation"""
+    if code == LOCKDOWN_E_PASSWORD_PROTECTED:
+        return f"ERROR: Could not validate with device {udid} because a passcode is set. Please enter the passcode on the device and retry.\n"
+    if code == LOCKDOWN_E_PAIRING_DIALOG_RESPONSE_PENDING:
+        return f"ERROR: Please accept the trust dialog on the screen of device {udid}, then attempt to pair again.\n"
+    if code == LOCKDOWN_E_USER_DENIED_PAIRING:
+        return f"ERROR: Device {udid} said that the user denied the trust dialog.\n"
+    if code in NOT_PAIRED_ERRORS:
+        return f"ERROR: Device {udid} is not paired with this host\n"
+    return f"ERROR: Device {udid} returned unhandled error code {code}\n"
+
+_binding = None
+_binding_lock = threading.Lock()
+_binding_loaded = False
+
+def get_binding():
+    """Shared IMobileDevice, or None when the libraries cannot be loaded or are disabled"""
+    global _binding, _binding_loaded
+    with _binding_lock:
+        if not _binding_loaded:
+            _binding_loaded = True
+            if os.environ.get(NATIVE_ENV, "1") != "0":
+                try:
+                    _binding = IMobileDevice.load()
+                except (OSError, AttributeError):
+                    _binding = None
+        return _binding
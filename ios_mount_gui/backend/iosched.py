@@ -0,0 +1,239 @@
+"""
+iOS Mount GUI - I/O Scheduler
+Shares the USB link between interactive, metadata and bulk mount I/O
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from backend import metrics
+
+INTERACTIVE, METADATA, BULK = 0, 1, 2
+CLASS_NAMES = {INTERACTIVE: "interactive", METADATA: "metadata", BULK: "bulk"}
+# Concurrent operations allowed per device
+DEFAULT_SLOTS = 2
+# Optional cap on bulk throughput per device, in MiB/s
+BULK_LIMIT_ENV = "IOS_MOUNT_BULK_LIMIT"
+
+# Mounts made with -o fsname=ifuse:<udid> show the device in the mount table
+FSNAME_PREFIX = "ifuse:"
+
+IO_WAIT = metrics.REGISTRY.histogram(
+    "ios_mount_io_wait_seconds", "Time spent queued for the device per priority class", ("priority",)
+)
+
+def bulk_limit_from_env():
+    """Bulk cap in bytes per second from IOS_MOUNT_BULK_LIMIT, or None"""
+    try:
+        limit = float(os.environ.get(BULK_LIMIT_ENV, 0))
+    except ValueError:
+        return None
+    return limit * 1024 * 1024 if limit > 0 else None
+
+def mount_entry(path):
+    """(mount_point, fstype, source) of the mount holding path, from /proc/self/mounts"""
+    path = os.path.realpath(path)
+    best = None
+    try:
+        with open("/proc/self/mounts") as f:
+            for line in f:
+                source, mount_point, fstype = line.split()[:3]
+                mount_point = mount_point.replace("\\040", " ")
+                inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and (best is None or len(mount_point) > len(best[0])):
+                    best = (mount_point, fstype, source)
+    except (OSError, ValueError):
+        return None
+    return best
+
+def device_source(udid):
+    """Mount source (fsname) of ifuse mounts of udid, which is also its queue key"""
+    return FSNAME_PREFIX + udid
+
+class DeviceQueue:
+    """Waiters and busy slots for one device"""
+
+    def __init__(self):
+        self.active = 0
+        self.waiting = []
+        # Interactive calls pending on this device hold its bulk work back
+        self.interactive = 0
+        # Earliest time the next bulk read may start under the bandwidth cap
+        self.bulk_ready = 0.0
+
+class IOScheduler:
+    """Grants device slots by priority class, pausing bulk work while interactive work waits"""
+
+    def __init__(self, slots=DEFAULT_SLOTS, bulk_limit=None):
+        self.slots = slots
+        self.bulk_limit = bulk_limit
+        self.cond = threading.Condition()
+        self.queues = {}
+        self.seq = itertools.count()
+        # st_dev -> device key, so the mount table is only read for new mounts
+        self.keys = {}
+        # Interactive calls not tied to a device hold bulk work back everywhere
+        self.interactive_anywhere = 0
+
+    def device_key(self, path):
+        """Queue key for the device behind path, or None for local storage
+
+        Every ifuse mount has its own st_dev, so keying by st_dev would give
+        each app mounted by a backup a queue (and a bulk cap) of its own.
+        Mounts are keyed by their FUSE source instead, which the mount
+        commands set to device_source(udid): every mount of one device
+        shares a queue, and other devices have theirs. Mounts made without
+        a UDID share the plain "ifuse" queue.
+        """
+        path = os.path.abspath(path)
+        while True:
+            try:
+                dev = os.stat(path).st_dev
+                break
+            except OSError:
+                parent = os.path.dirname(path)
+                if parent == path:
+                    return None
+                path = parent
+        with self.cond:
+            if dev in self.keys:
+                return self.keys[dev]
+        entry = mount_entry(path)
+        key = entry[2] if entry and entry[1].startswith("fuse") else None
+        with self.cond:
+            self.keys[dev] = key
+        return key
+
+    def set_bulk_limit(self, bytes_per_second):
+        """Cap bulk throughput per device, or remove the cap with None"""
+        with self.cond:
+            self.bulk_limit = bytes_per_second or None
+
+    def _throttle(self, queue, nbytes):
+        """Pace bulk reads so each device stays under bulk_limit"""
+        with self.cond:
+            if not self.bulk_limit or not nbytes:
+                return
+            now = time.monotonic()
+            start = max(queue.bulk_ready, now)
+            queue.bulk_ready = start + nbytes / self.bulk_limit
+        if start > now:
+            time.sleep(start - now)
+
+    def acquire(self, key, priority):
+        entry = (priority, next(self.seq))
+        with self.cond:
+            queue = self.queues.setdefault(key, DeviceQueue())
+            heapq.heappush(queue.waiting, entry)
+            if priority == INTERACTIVE:
+                queue.interactive += 1
+            while not (queue.active < self.slots and queue.waiting[0] == entry
+                       and (priority != BULK or not (queue.interactive or self.interactive_anywhere))):
+                self.cond.wait()
+            heapq.heappop(queue.waiting)
+            queue.active += 1
+
+    def release(self, key, priority):
+        with self.cond:
+            queue = self.queues[key]
+            queue.active -= 1
+            if priority == INTERACTIVE:
+                queue.interactive -= 1
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self, key, priority=INTERACTIVE, nbytes=0):
+        """Hold one slot on device key for the duration of an I/O call
+
+        Key None is local storage, which is neither queued nor throttled.
+        """
+        if key is None:
+            yield
+            return
+        if priority == BULK:
+            with self.cond:
+                queue = self.queues.setdefault(key, DeviceQueue())
+            self._throttle(queue, nbytes)
+        start = time.perf_counter()
+        self.acquire(key, priority)
+        IO_WAIT.observe(time.perf_counter() - start, priority=CLASS_NAMES[priority])
+        try:
+            yield
+        finally:
+            self.release(key, priority)
+
+    def request(self, path, priority=INTERACTIVE, nbytes=0):
+        """Hold a slot on the device containing path"""
+        return self.slot(self.device_key(path), priority, nbytes)
+
+    @contextmanager
+    def interactive(self, key=None):
+        """Hold bulk work on device key back while a user-facing call that bypasses the mount runs
+
+        Without a key, bulk work on every device waits.
+        """
+        with self.cond:
+            if key is None:
+                self.interactive_anywhere += 1
+            else:
+                self.queues.setdefault(key, DeviceQueue()).interactive += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                if key is None:
+                    self.interactive_anywhere -= 1
+                else:
+                    self.queues[key].interactive -= 1
+                self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            return {
+                "bulk_limit": self.bulk_limit,
+                "interactive_pending": self.interactive_anywhere + sum(q.interactive for q in self.queues.values()),
+                "devices": {
+                    key: {"active": q.active, "waiting": len(q.waiting), "interactive": q.interactive}
+                    for key, q in self.queues.items()
+                },
+            }
+
+SCHEDULER = IOScheduler(bulk_limit=bulk_limit_from_env())
+
+class ScheduledFile:
+    """File wrapper whose reads and writes each wait their turn for the device"""
+
+    def __init__(self, f, path, priority=BULK, scheduler=None):
+        self.f = f
+        self.priority = priority
+        self.scheduler = scheduler or SCHEDULER
+        self.key = self.scheduler.device_key(path)
+
+    def readinto(self, buf):
+        with self.scheduler.slot(self.key, self.priority, len(buf)):
+            return self.f.readinto(buf)
+
+    def read(self, size=-1):
+        with self.scheduler.slot(self.key, self.priority, max(size, 0)):
+            return self.f.read(size)
+
+    def write(self, data):
+        with self.scheduler.slot(self.key, self.priority, len(data)):
+            return self.f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.f.close()
+
+def open_scheduled(path, mode='rb', priority=BULK, buffering=0):
+    """open() whose reads and writes go through the shared scheduler"""
+    return ScheduledFile(open(path, mode, buffering=buffering), path, priority)
@@ -0,0 +1,76 @@
+"""
+iOS Mount GUI - Background Jobs
+Long-running backend operations polled through /api/jobs
+"""
+
+import threading
+import time
+import uuid
+
+class Job:
+    """State of one background operation"""
+
+    def __init__(self, kind, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.status = "running"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+
+    def report(self, **progress):
+        """Progress callback handed to the job function"""
+        self.progress = progress
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+class JobManager:
+    """Runs jobs on daemon threads and keeps their results for polling"""
+
+    def __init__(self, keep=50):
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def start(self, kind, func, params=None):
+        """Run func(job) in the background and return the job"""
+        job = Job(kind, params or {})
+
+        def runner():
+            try:
+                job.result = func(job)
+                job.status = "done"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            job.finished = time.time()
+
+        with self.lock:
+            self.jobs[job.id] = job
+            finished = [j for j in self.jobs.values() if j.finished]
+            for old in sorted(finished, key=lambda j: j.finished)[:max(0, len(self.jobs) - self.keep)]:
+                del self.jobs[old.id]
+        threading.Thread(target=runner, daemon=True, name=f"job-{kind}").start()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def all(self):
+        with self.lock:
+            return sorted(self.jobs.values(), key=lambda j: j.started)
@@ -0,0 +1,188 @@
+"""
+iOS Mount GUI - Metrics Registry
+In-process counters and histograms with Prometheus text export
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Monotonic counter, one series per label combination"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self.lock:
+            return self.series.get(self._key(labels), 0)
+
+    def render(self):
+        lines = self.header()
+        with self.lock:
+            for key, value in sorted(self.series.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram(_Metric):
+    """Cumulative bucket histogram, one series per label combination"""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            counts, total, count, maximum = self.series.get(key, ([0] * len(self.buckets), 0.0, 0, 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.series[key] = (counts, total + value, count + 1, max(maximum, value))
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = self.header()
+        with self.lock:
+            for key, (counts, total, count, _) in sorted(self.series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, *args, **kwargs)
+            return self.metrics[name]
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render_prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Short human readable digest for the GUI"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            with metric.lock:
+                series = sorted(metric.series.items())
+            for key, value in series:
+                label = ", ".join(f"{n}={v}" for n, v in zip(metric.labelnames, key))
+                if isinstance(metric, Histogram):
+                    _, total, count, maximum = value
+                    lines.append(
+                        f"{metric.name} [{label}]: n={count} avg={total / count * 1000:.1f}ms max={maximum * 1000:.1f}ms"
+                    )
+                else:
+                    lines.append(f"{metric.name} [{label}]: {value}")
+        return "\n".join(lines) if lines else "No metrics recorded yet"
+
+REGISTRY = Registry()
+
+COMMAND_LATENCY = REGISTRY.histogram(
+    "ios_mount_command_duration_seconds", "Subprocess latency per command", ("command",)
+)
+COMMAND_TIMEOUTS = REGISTRY.counter(
+    "ios_mount_command_timeouts_total", "Subprocess calls that hit their timeout", ("command",)
+)
+COMMAND_FAILURES = REGISTRY.counter(
+    "ios_mount_command_failures_total", "Subprocess calls that exited non-zero or errored", ("command",)
+)
+REQUEST_LATENCY = REGISTRY.histogram(
+    "ios_mount_request_duration_seconds", "HTTP request latency per route", ("route", "method", "status")
+)
+ENTRIES_LISTED = REGISTRY.counter(
+    "ios_mount_entries_listed_total", "Directory entries listed per mount", ("mount",)
+)
+BYTES_TRANSFERRED = REGISTRY.counter(
+    "ios_mount_bytes_transferred_total", "Bytes moved to or from a mount", ("mount", "direction")
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "ios_mount_cache_requests_total", "Cache lookups by outcome", ("cache", "result")
+)
+
+def command_name(command):
+    """Label a shell command by its executable, e.g. 'ideviceinfo'"""
+    parts = command.split() if isinstance(command, str) else list(command)
+    return os.path.basename(parts[0]) if parts else ""
+
+def record_command(command, duration, success, timed_out=False):
+    """Record one subprocess call"""
+    name = command_name(command)
+    COMMAND_LATENCY.observe(duration, command=name)
+    if timed_out:
+        COMMAND_TIMEOUTS.inc(command=name)
+    if not success:
+        COMMAND_FAILURES.inc(command=name)
+
+def record_cache(cache, hit):
+    """Record a cache lookup as a hit or a miss"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+def cache_hit_rates():
+    """Hit ratio per cache name"""
+    totals = {}
+    with CACHE_REQUESTS.lock:
+        for (cache, result), value in CACHE_REQUESTS.series.items():
+            hits, lookups = totals.get(cache, (0, 0))
+            totals[cache] = (hits + (value if result == "hit" else 0), lookups + value)
+    return {cache: hits / lookups for cache, (hits, lookups) in totals.items() if lookups}
@@ -0,0 +1,121 @@
+"""
+iOS Mount GUI - Operation Log
+Append-only JSON Lines history shared by the GUI and the backend server
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+APP_DIR = Path.home() / ".ios_mount_gui"
+LOG_PATH = APP_DIR / "operation_log.jsonl"
+# Whole-file JSON array written by earlier versions
+LEGACY_PATH = APP_DIR / "operation_log.json"
+
+class OperationLog:
+    """One JSON object per line, so writers append and readers can seek"""
+
+    def __init__(self, path=LOG_PATH, legacy_path=LEGACY_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if legacy_path:
+            self._migrate(Path(legacy_path))
+
+    def _migrate(self, legacy_path):
+        """Convert the old JSON array log once, keeping its entries"""
+        if not legacy_path.exists() or self.path.exists():
+            return
+        migrated = legacy_path.with_suffix(".json.migrated")
+        try:
+            # Only one process wins the rename, so entries are copied once
+            legacy_path.rename(migrated)
+        except OSError:
+            return
+        try:
+            with open(migrated) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+        with open(self.path, 'a') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+    def append(self, operation, status, details=""):
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "operation": operation,
+            "status": status,
+            "details": details
+        }
+        line = (json.dumps(entry) + "\n").encode()
+        # A single O_APPEND write keeps lines whole across processes
+        with self.lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        return entry
+
+    def clear(self):
+        with self.lock:
+            with open(self.path, 'w'):
+                pass
+
+    def size(self):
+        try:
+            return self.path.stat().st_size
+        except OSError:
+            return 0
+
+    def scan(self, offset=0):
+        """Index complete lines from offset on
+
+        Returns ([(line_offset, operation, status)], next_offset). Callers
+        keep next_offset and pass it back to pick up only new entries.
+        """
+        index = []
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Partial line from a writer mid-append; read it next time
+                        break
+                    try:
+                        entry = json.loads(line)
+                        index.append((offset, entry.get("operation", ""), entry.get("status", "")))
+                    except ValueError:
+                        pass
+                    offset += len(line)
+        except OSError:
+            pass
+        return index, offset
+
+    def read_at(self, offset):
+        """Load the full entry starting at offset"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def read_all(self, operation=None, status=None, limit=None):
+        """Entries in order, optionally filtered and limited to the newest"""
+        entries = []
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if operation and entry.get("operation") != operation:
+                        continue
+                    if status and entry.get("status") != status:
+                        continue
+                    entries.append(entry)
+        except OSError:
+            pass
+        return entries[-limit:] if limit else entries
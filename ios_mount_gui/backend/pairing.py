@@ -0,0 +1,104 @@
+"""
+iOS Mount GUI - Pairing State Cache
+Skips idevicepair validate for devices already known to trust this host
+"""
+
+import threading
+import time
+
+from backend import metrics
+from backend.commands import validate_pairing
+
+# Output fragments from ifuse/idevicepair that mean the lockdown pairing is unusable
+PAIRING_ERROR_MARKERS = (
+    "lockdown", "not paired", "pairing", "invalidhostid", "invalid host id",
+    "passwordprotected", "password protected", "user denied", "trust"
+)
+# idevicepair asks the user to tap Trust; the outcome is unknown until validated
+TRUST_PROMPT_MARKERS = ("trust dialog", "please accept", "enter the passcode")
+
+def is_pairing_error(text):
+    text = (text or "").lower()
+    return any(marker in text for marker in PAIRING_ERROR_MARKERS)
+
+def is_trust_prompt(text):
+    text = (text or "").lower()
+    return any(marker in text for marker in TRUST_PROMPT_MARKERS)
+
+def result_output(result):
+    return (result.get("stdout") or "") + (result.get("stderr") or "")
+
+class PairingCache:
+    """In-memory record of which UDIDs currently trust this host"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.trusted = {}
+
+    def is_trusted(self, udid):
+        with self.lock:
+            hit = udid in self.trusted
+        metrics.record_cache("pairing", hit)
+        return hit
+
+    def mark_trusted(self, udid):
+        with self.lock:
+            self.trusted[udid] = time.time()
+
+    def invalidate(self, udid=None):
+        """Forget one device, or every device when udid is None"""
+        with self.lock:
+            if udid is None:
+                self.trusted.clear()
+            else:
+                self.trusted.pop(udid, None)
+
+    def observe_devices(self, attached):
+        """Drop devices that are no longer attached"""
+        attached = set(attached)
+        with self.lock:
+            for udid in list(self.trusted):
+                if udid not in attached:
+                    del self.trusted[udid]
+
+    def observe_pairing(self, udid, result):
+        """Update state from an idevicepair validate/pair result"""
+        if not udid:
+            return
+        if result["success"] and not is_trust_prompt(result_output(result)):
+            self.mark_trusted(udid)
+        else:
+            self.invalidate(udid)
+
+def mount_with_pairing(mount_command, run, cache, udid=None):
+    """Mount, validating and pairing only when the device is not known to be trusted
+
+    run(command) must return a dict with success/stdout/stderr. Returns the
+    list of {"step", "result"} dicts in the order they ran.
+    """
+    steps = []
+    if udid and cache.is_trusted(udid):
+        result = run(mount_command)
+        steps.append({"step": "mount", "result": result})
+        if result["success"] or not is_pairing_error(result_output(result)):
+            return steps
+        # Trust was revoked since we last looked: fall back to the full flow
+        cache.invalidate(udid)
+
+    device_arg = f" -u {udid}" if udid else ""
+    result = validate_pairing(udid, run)
+    steps.append({"step": "validate", "result": result})
+    cache.observe_pairing(udid, result)
+
+    if not result["success"]:
+        result = run(f"idevicepair{device_arg} pair")
+        steps.append({"step": "pair", "result": result})
+        cache.observe_pairing(udid, result)
+
+    result = run(mount_command)
+    steps.append({"step": "mount", "result": result})
+    if udid and result["success"]:
+        cache.mark_trusted(udid)
+    elif udid and is_pairing_error(result_output(result)):
+        cache.invalidate(udid)
+    return steps
@@ -0,0 +1,166 @@
+"""
+iOS Mount GUI - Directory Prefetcher
+Lists subdirectories ahead of navigation within a bounded memory budget
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from backend import metrics
+from backend.iosched import INTERACTIVE, METADATA, SCHEDULER
+
+DEFAULT_BUDGET = 8 * 1024 * 1024
+HEAD_SIZE = 4096
+SMALL_FILE = 256 * 1024
+# Files worth pre-reading because a preview is likely to ask for them
+PREVIEW_EXTENSIONS = {
+    ".txt", ".log", ".md", ".csv", ".json", ".plist", ".xml", ".html",
+    ".png", ".jpg", ".jpeg", ".gif", ".heic", ".webp"
+}
+# Rough per-entry overhead of a cached listing beyond the name itself
+ENTRY_OVERHEAD = 96
+# Cached listings and heads are trusted at most this long; ifuse mtimes can be coarse
+CACHE_TTL = 10
+
+def scan_directory(path, priority=INTERACTIVE):
+    """List path as sorted (name, is_dir, size) tuples"""
+    entries = []
+    with SCHEDULER.request(path, priority), os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+                size = 0 if is_dir else entry.stat().st_size
+            except OSError:
+                is_dir, size = False, 0
+            entries.append((entry.name, is_dir, size))
+    entries.sort()
+    return entries
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _lower_thread_priority():
+    """Run the calling thread at a lower CPU/IO niceness where supported"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+class DirectoryPrefetcher:
+    """LRU cache of listings and file heads filled by a low priority thread"""
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.cache = OrderedDict()
+        self.pending = deque()
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._worker, daemon=True, name="prefetch")
+        self.thread.start()
+
+    # --- cache ---
+
+    def _store(self, key, value, cost):
+        with self.cond:
+            old = self.cache.pop(key, None)
+            if old:
+                self.used -= old[1]
+            if cost > self.budget:
+                return
+            self.cache[key] = (value, cost, time.monotonic())
+            self.used += cost
+            while self.used > self.budget:
+                _, (_, evicted_cost, _) = self.cache.popitem(last=False)
+                self.used -= evicted_cost
+
+    def _lookup(self, key, cache_name, valid=lambda value: True):
+        """Cached value for key if it is younger than CACHE_TTL and valid(value) agrees"""
+        with self.cond:
+            found = item = self.cache.get(key)
+        if item and (time.monotonic() - item[2] > CACHE_TTL or not valid(item[0])):
+            item = None
+        with self.cond:
+            if item:
+                self.cache.move_to_end(key)
+            elif found and self.cache.get(key) is found:
+                # Stale; drop it unless the worker already stored a fresh one
+                self.used -= self.cache.pop(key)[1]
+        metrics.record_cache(cache_name, item is not None)
+        return item[0] if item else None
+
+    def invalidate(self, path=None):
+        """Drop cached data for path and everything below it, or all of it"""
+        with self.cond:
+            for key in list(self.cache):
+                if path is None or key[1] == path or key[1].startswith(path.rstrip(os.sep) + os.sep):
+                    self.used -= self.cache.pop(key)[1]
+
+    # --- public API ---
+
+    def list_dir(self, path):
+        """Listing for path, from the cache when prefetched and the directory is unchanged"""
+        def unchanged(cached):
+            try:
+                with SCHEDULER.request(path, INTERACTIVE):
+                    return os.stat(path).st_mtime_ns == cached[1]
+            except OSError:
+                return False
+
+        cached = self._lookup(("dir", path), "dir_listing", unchanged)
+        if cached is not None:
+            return cached[0]
+        mtime_ns = _mtime_ns(path)
+        entries = scan_directory(path)
+        self._cache_listing(path, entries, mtime_ns)
+        return entries
+
+    def head(self, path):
+        """Cached first HEAD_SIZE bytes of a small file, or None"""
+        return self._lookup(("head", path), "file_head")
+
+    def prefetch_children(self, path, entries):
+        """Queue the subdirectories and previewable small files of a listing just shown"""
+        with self.cond:
+            # The user moved on; older speculation is no longer useful
+            self.pending.clear()
+            for name, is_dir, size in entries:
+                child = os.path.join(path, name)
+                if is_dir and ("dir", child) not in self.cache:
+                    self.pending.append(("dir", child))
+                elif (not is_dir and size <= SMALL_FILE
+                      and os.path.splitext(name)[1].lower() in PREVIEW_EXTENSIONS
+                      and ("head", child) not in self.cache):
+                    self.pending.append(("head", child))
+            self.cond.notify()
+
+    # --- background work ---
+
+    def _cache_listing(self, path, entries, mtime_ns):
+        if mtime_ns is None:
+            return
+        cost = sum(len(name) + ENTRY_OVERHEAD for name, _, _ in entries)
+        self._store(("dir", path), (entries, mtime_ns), cost)
+
+    def _worker(self):
+        _lower_thread_priority()
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                kind, path = self.pending.popleft()
+            try:
+                if kind == "dir":
+                    # mtime first, so a change during the scan makes the entry stale rather than wrong
+                    mtime_ns = _mtime_ns(path)
+                    self._cache_listing(path, scan_directory(path, METADATA), mtime_ns)
+                else:
+                    with SCHEDULER.request(path, METADATA), open(path, 'rb') as f:
+                        data = f.read(HEAD_SIZE)
+                    self._store(("head", path), data, len(data) + ENTRY_OVERHEAD)
+            except OSError:
+                pass
@@ -0,0 +1,225 @@
+"""
+iOS Mount GUI - File Preview
+Partial reads for text, plist, JSON and image previews plus a paged hex view
+"""
+
+import json
+import mmap
+import os
+import plistlib
+import struct
+from collections import OrderedDict
+
+from backend.iosched import INTERACTIVE, SCHEDULER, mount_entry
+
+# Text-like previews show at most this much of the file
+TEXT_BYTES = 8 * 1024
+# Hex view pages and read-ahead are done in blocks of this size
+BLOCK_SIZE = 4096
+# Most bytes one preview may pull over the device link
+READ_BUDGET = 1024 * 1024
+# Blocks kept per open file so scrolling back does not re-read
+CACHED_BLOCKS = 64
+# Image headers are searched this far for dimensions (JPEG SOF can follow EXIF)
+IMAGE_HEADER_BYTES = 256 * 1024
+HEX_ROW = 16
+
+def filesystem_type(path):
+    """Filesystem type of the mount holding path, from /proc/self/mounts"""
+    entry = mount_entry(path)
+    return entry[1] if entry else None
+
+def is_device_path(path):
+    """True for files behind an ifuse (or any FUSE) mount"""
+    return (filesystem_type(path) or "").startswith("fuse")
+
+def is_device_mount(mount_point):
+    """True when mount_point is itself an ifuse (or any FUSE) mount, not just any directory"""
+    return os.path.ismount(mount_point) and is_device_path(mount_point)
+
+class FileWindow:
+    """Random access to one file that reads only the blocks asked for
+
+    Local files are memory-mapped and read freely. Files on a device mount
+    are read block by block through the I/O scheduler, and at most budget
+    bytes are fetched over the link for the lifetime of the window.
+    """
+
+    def __init__(self, path, budget=READ_BUDGET, head=None):
+        self.path = path
+        self.budget = budget
+        self.bytes_read = 0
+        self.blocks = OrderedDict()
+        self.file = open(path, 'rb', buffering=0)
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.map = None
+        if not is_device_path(path) and self.size:
+            try:
+                self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                self.map = None
+        # A head prefetched by the browser saves the first round trip
+        if head and len(head) >= min(BLOCK_SIZE, self.size):
+            self.blocks[0] = head[:BLOCK_SIZE]
+
+    @property
+    def exhausted(self):
+        return self.map is None and self.bytes_read >= self.budget
+
+    def _block(self, index):
+        block = self.blocks.get(index)
+        if block is not None:
+            self.blocks.move_to_end(index)
+            return block
+        if self.exhausted:
+            return None
+        with SCHEDULER.request(self.path, INTERACTIVE):
+            self.file.seek(index * BLOCK_SIZE)
+            block = self.file.read(BLOCK_SIZE)
+        self.bytes_read += len(block)
+        self.blocks[index] = block
+        if len(self.blocks) > CACHED_BLOCKS:
+            self.blocks.popitem(last=False)
+        return block
+
+    def read(self, offset, length):
+        """Bytes at offset, shorter than length at EOF or once the budget is spent"""
+        length = max(0, min(length, self.size - offset))
+        if self.map is not None:
+            return self.map[offset:offset + length]
+        chunks = []
+        end = offset + length
+        while offset < end:
+            index, start = divmod(offset, BLOCK_SIZE)
+            block = self._block(index)
+            if not block:
+                break
+            piece = block[start:start + end - offset]
+            chunks.append(piece)
+            offset += len(piece)
+        return b"".join(chunks)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def hex_row(offset, data):
+    """One hexdump line: offset, hex bytes and printable ASCII"""
+    hex_part = " ".join(f"{b:02x}" for b in data)
+    text = "".join(chr(b) if 32 <= b < 127 else "." for b in data)
+    return f"{offset:08x}  {hex_part:<{HEX_ROW * 3 - 1}}  {text}"
+
+def hex_rows(window, offset, count):
+    """count hexdump rows starting at offset (aligned down to a row)"""
+    offset -= offset % HEX_ROW
+    data = window.read(offset, count * HEX_ROW)
+    return [hex_row(offset + i, data[i:i + HEX_ROW]) for i in range(0, len(data), HEX_ROW)]
+
+def image_dimensions(window):
+    """(format, width, height) from the image header, or None"""
+    head = window.read(0, 32)
+    # Truncated files can end inside a header, so lengths are checked before unpacking
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR" and len(head) >= 24:
+        width, height = struct.unpack(">II", head[16:24])
+        return "PNG", width, height
+    if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+        width, height = struct.unpack("<HH", head[6:10])
+        return "GIF", width, height
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return _webp_dimensions(head)
+    if head.startswith(b"\xff\xd8"):
+        return _jpeg_dimensions(window)
+    return None
+
+def _webp_dimensions(head):
+    chunk = head[12:16]
+    if chunk == b"VP8X" and len(head) >= 30:
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return "WebP", width, height
+    if chunk == b"VP8L" and len(head) >= 25:
+        bits = int.from_bytes(head[21:25], "little")
+        return "WebP", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 " and len(head) >= 30:
+        width, height = struct.unpack("<HH", head[26:30])
+        return "WebP", width & 0x3FFF, height & 0x3FFF
+    return None
+
+def _jpeg_dimensions(window):
+    """Walk JPEG segments to the first start-of-frame marker"""
+    offset = 2
+    while offset < min(window.size, IMAGE_HEADER_BYTES):
+        marker = window.read(offset, 4)
+        if len(marker) < 4 or marker[0] != 0xFF:
+            return None
+        kind, length = marker[1], struct.unpack(">H", marker[2:4])[0]
+        if 0xC0 <= kind <= 0xCF and kind not in (0xC4, 0xC8, 0xCC):
+            frame = window.read(offset + 5, 4)
+            if len(frame) < 4:
+                return None
+            height, width = struct.unpack(">HH", frame)
+            return "JPEG", width, height
+        offset += 2 + length
+    return None
+
+def decode_text(data):
+    """Decode as UTF-8 text, or None if the bytes look binary"""
+    if b"\x00" in data:
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the window is fine
+        if e.start >= len(data) - 3:
+            return data[:e.start].decode("utf-8")
+        return None
+
+def preview_file(window):
+    """Describe a file from as few bytes as possible
+
+    Returns a dict with kind (image, plist, json, text or binary), size,
+    bytes_read, truncated, and text and/or width/height when known.
+    """
+    ext = os.path.splitext(window.path)[1].lower()
+    result = {"kind": "binary", "size": window.size, "truncated": False}
+
+    dimensions = image_dimensions(window)
+    if dimensions:
+        result.update(kind="image", format=dimensions[0], width=dimensions[1], height=dimensions[2])
+    else:
+        head = window.read(0, TEXT_BYTES)
+        complete = len(head) == window.size
+        result["truncated"] = not complete
+        if head.startswith(b"bplist00"):
+            result["kind"] = "plist"
+            # Binary plists keep their offset table at the end, so only small ones parse
+            if complete:
+                try:
+                    result["text"] = json.dumps(plistlib.loads(head), indent=2, default=str)
+                except (plistlib.InvalidFileException, ValueError, OverflowError):
+                    pass
+        else:
+            text = decode_text(head)
+            if text is not None:
+                stripped = text.lstrip()
+                if ext == ".plist" or (stripped.startswith("<?xml") and "<plist" in stripped[:200]):
+                    result["kind"] = "plist"
+                elif ext == ".json" or stripped[:1] in ("{", "["):
+                    result["kind"] = "json"
+                    if complete:
+                        try:
+                            text = json.dumps(json.loads(text), indent=2)
+                        except ValueError:
+                            pass
+                else:
+                    result["kind"] = "text"
+                result["text"] = text
+    result["bytes_read"] = window.bytes_read
+    return result
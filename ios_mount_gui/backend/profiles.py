@@ -0,0 +1,165 @@
+"""
+iOS Mount GUI - Device Profile Store
+SQLite cache of known devices so Device Info renders before any query
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from backend.imobiledevice import LockdownError, get_binding
+
+DB_PATH = Path.home() / ".ios_mount_gui" / "devices.db"
+
+# Profile field -> lockdown key queried through ideviceinfo -k
+DEVICE_KEYS = {
+    "device_class": "DeviceClass",
+    "product_type": "ProductType",
+    "ios_version": "ProductVersion",
+    "total_capacity": "TotalDiskCapacity",
+    "free_capacity": "FreeDiskSpace",
+}
+# Fields that never change for a UDID and are only queried once
+STATIC_FIELDS = ("device_class", "product_type")
+# Fields reconciled in the background on every attach
+VOLATILE_FIELDS = ("name", "ios_version", "total_capacity", "free_capacity")
+INTEGER_FIELDS = ("total_capacity", "free_capacity")
+
+COLUMNS = (
+    "udid", "name", "device_class", "product_type", "ios_version",
+    "total_capacity", "free_capacity", "paired", "mount_point", "mount_mode",
+    "first_seen", "last_seen",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    udid TEXT PRIMARY KEY,
+    name TEXT,
+    device_class TEXT,
+    product_type TEXT,
+    ios_version TEXT,
+    total_capacity INTEGER,
+    free_capacity INTEGER,
+    paired INTEGER,
+    mount_point TEXT,
+    mount_mode TEXT,
+    first_seen REAL,
+    last_seen REAL
+)
+"""
+
+def parse_value(field, text):
+    """Convert ideviceinfo output for field into the stored type"""
+    text = text.strip()
+    if field in INTEGER_FIELDS:
+        try:
+            return int(text)
+        except ValueError:
+            return None
+    return text or None
+
+def format_gb(value):
+    return f"{value / (1024**3):.2f} GB" if value else None
+
+def profile_to_info(profile):
+    """Render a stored profile in the /api/device-info response shape"""
+    info = {
+        "udid": profile["udid"],
+        "name": profile["name"],
+        "class": profile["device_class"],
+        "product_type": profile["product_type"],
+        "ios_version": profile["ios_version"],
+        "total_storage": format_gb(profile["total_capacity"]),
+        "free_storage": format_gb(profile["free_capacity"]),
+        "paired": None if profile["paired"] is None else bool(profile["paired"]),
+        "mount_point": profile["mount_point"],
+        "mount_mode": profile["mount_mode"],
+        "last_seen": profile["last_seen"],
+    }
+    return {key: value for key, value in info.items() if value is not None}
+
+def parse_pairing_udid(text):
+    """Pull the UDID out of idevicepair output, e.g. 'Validated pairing with device <udid>'"""
+    match = re.search(r"device ([0-9A-Fa-f-]{24,})", text or "")
+    return match.group(1) if match else None
+
+def native_value(binding, udid, field):
+    """Query field through the in-process bindings, or None to use the CLI"""
+    try:
+        if field == "name":
+            value = binding.device_name(udid)
+        else:
+            value = binding.get_value(udid, DEVICE_KEYS[field])
+    except LockdownError:
+        return None
+    return None if value is None else parse_value(field, str(value))
+
+def query_device_fields(udid, fields, run):
+    """Query fields from the device using run(command) -> (success, stdout)"""
+    binding = get_binding()
+    values = {}
+    for field in fields:
+        value = native_value(binding, udid, field) if binding else None
+        if value is not None:
+            values[field] = value
+            continue
+        if field == "name":
+            success, output = run(f"idevicename -u {udid}")
+        else:
+            success, output = run(f"ideviceinfo -u {udid} -k {DEVICE_KEYS[field]}")
+        value = parse_value(field, output) if success else None
+        if value is not None:
+            values[field] = value
+    return values
+
+def missing_fields(profile):
+    """Fields that must be queried for this profile, static ones only when unknown"""
+    if profile is None:
+        return ("name",) + tuple(DEVICE_KEYS)
+    return tuple(f for f in STATIC_FIELDS if not profile[f]) + VOLATILE_FIELDS
+
+class DeviceProfileStore:
+    """Known devices keyed by UDID"""
+
+    def __init__(self, path=DB_PATH):
+        Path(path).parent.mkdir(exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute(SCHEMA)
+
+    def get(self, udid):
+        """Return the profile for udid as a dict, or None"""
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM devices WHERE udid = ?", (udid,)).fetchone()
+        return dict(row) if row else None
+
+    def latest(self):
+        """Most recently seen device, for rendering before any device query"""
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM devices ORDER BY last_seen DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def all(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT * FROM devices ORDER BY last_seen DESC").fetchall()
+        return [dict(row) for row in rows]
+
+    def update(self, udid, **fields):
+        """Insert or update a profile, touching last_seen"""
+        fields = {key: value for key, value in fields.items() if key in COLUMNS and key != "udid"}
+        now = time.time()
+        fields["last_seen"] = now
+        names = ", ".join(fields)
+        placeholders = ", ".join("?" for _ in fields)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in fields)
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO devices (udid, first_seen, {names}) VALUES (?, ?, {placeholders}) "
+                f"ON CONFLICT(udid) DO UPDATE SET {updates}",
+                (udid, now, *fields.values())
+            )
+        return self.get(udid)
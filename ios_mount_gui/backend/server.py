@@ -3,14 +3,39 @@ iOS Mount GUI - Python Backend Server
 Provides REST API for the Electron frontend
 """
 
-import json
-import subprocess
+import mimetypes
 import os
-import threading
+import sqlite3
+import sys
+import time
 from pathlib import Path
-from datetime import datetime
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.wsgi import FileWrapper
+
+# Allow `python backend/server.py` to import the sibling backend modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend import metrics, tracing
+from backend.backup import DEFAULT_CONCURRENCY, AppBackup, paired_mounter
+from backend.commands import ifuse_device_args, parse_app_list, run_command, validate_pairing
+from backend.export import FORMATS, iter_archive
+from backend.iosched import BULK, SCHEDULER, ScheduledFile, open_scheduled
+from backend.jobs import JobManager
+from backend.oplog import OperationLog
+from backend.pairing import PairingCache, mount_with_pairing
+from backend.preview import FileWindow, hex_rows, is_device_mount, preview_file
+from backend.profiles import (
+    DeviceProfileStore, parse_pairing_udid, profile_to_info
+)
+from backend.service import connect_service
+from backend.snapshots import MODES as SNAPSHOT_MODES, SnapshotStore
+from backend.sqlite_inspector import list_tables, open_database, query_page, table_query
+from backend.transfer import (
+    CHUNK_SIZE, copy_stream, discard_part, finish_part, part_path, prepare_part, resume_offset, source_identity
+)
+from backend.verify import MODES as VERIFY_MODES, verify_trees
 
 app = Flask(__name__)
 CORS(app)
@@ -18,65 +43,135 @@ CORS(app)
 # Setup directories
 APP_DIR = Path.home() / ".ios_mount_gui"
 APP_DIR.mkdir(exist_ok=True)
-LOG_FILE = APP_DIR / "operation_log.json"
 
-def run_command(command, timeout=30):
-    """Execute a shell command and return result"""
-    try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        return {
-            "success": result.returncode == 0,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "code": result.returncode
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "stdout": "",
-            "stderr": "Command timed out",
-            "code": -1
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "stdout": "",
-            "stderr": str(e),
-            "code": -1
-        }
+operation_log = OperationLog()
+profile_store = DeviceProfileStore()
+pairing_cache = PairingCache()
+jobs = JobManager()
+snapshot_store = SnapshotStore()
+# Joined at import so flask run and gunicorn workers share it too
+service = connect_service(profile_store=profile_store, pairing_cache=pairing_cache)
+
+# POST routes that only read state, so their responses can be revalidated too
+CONDITIONAL_POSTS = {"/api/is-mounted", "/api/batch", "/api/sqlite/query"}
 
 def log_operation(operation, status, details=""):
     """Log operation to file"""
     try:
-        logs = []
-        if LOG_FILE.exists():
-            with open(LOG_FILE, 'r') as f:
-                logs = json.load(f)
-        
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "operation": operation,
-            "status": status,
-            "details": details
-        }
-        logs.append(log_entry)
-        
-        with open(LOG_FILE, 'w') as f:
-            json.dump(logs, f, indent=2)
+        operation_log.append(operation, status, details)
     except Exception as e:
         print(f"Failed to log operation: {e}")
 
+def resolve_mount_path(mount_point, rel_path):
+    """Resolve a client supplied path inside a device mount, refusing anything else
+
+    mount_point comes from the client, so it must be an actual FUSE mount;
+    otherwise mount=/ would expose the whole host.
+    """
+    if not is_device_mount(mount_point):
+        return None
+    root = os.path.realpath(mount_point)
+    full_path = os.path.realpath(os.path.join(root, rel_path.lstrip('/')))
+    if os.path.commonpath([root, full_path]) != root:
+        return None
+    return full_path
+
+def upload_identity():
+    """Identity of the client's file from ?total= and ?mtime=, matched against a .part"""
+    return source_identity(request.args.get('total', type=int), request.args.get('mtime', type=int))
+
+def file_etag(st):
+    """Build a strong ETag from inode, size and mtime"""
+    return f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+
+def record_pairing(result):
+    """Remember the pairing outcome for the device idevicepair reported"""
+    udid = parse_pairing_udid(result["stdout"] + result["stderr"])
+    if udid:
+        profile_store.update(udid, paired=int(result["success"]))
+        pairing_cache.observe_pairing(udid, result)
+
+def attached_udids():
+    """UDIDs currently attached, forgetting pairing state for detached ones"""
+    return service.udids()
+
+def count_bytes(chunks, mount_point, direction):
+    """Pass chunks through while counting them as transferred bytes"""
+    for chunk in chunks:
+        metrics.BYTES_TRANSFERRED.inc(len(chunk), mount=mount_point, direction=direction)
+        yield chunk
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    end = time.perf_counter()
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.REQUEST_LATENCY.observe(
+        end - g.request_start,
+        route=route, method=request.method, status=response.status_code
+    )
+    tracing.record_span(f"{request.method} {route}", "http", g.request_start, end, status=response.status_code)
+    return response
+
+@app.after_request
+def conditional_response(response):
+    """Tag JSON read responses and answer 304 when the client already has them"""
+    route = request.url_rule.rule if request.url_rule else None
+    if request.method != "GET" and route not in CONDITIONAL_POSTS:
+        return response
+    if response.status_code != 200 or response.is_streamed or response.mimetype != "application/json":
+        return response
+    # Werkzeug only evaluates If-None-Match for GET/HEAD, so compare here for all methods
+    response.add_etag()
+    etag, _ = response.get_etag()
+    if request.if_none_match.contains_weak(etag):
+        response.status_code = 304
+        response.set_data(b"")
+    return response
+
+def device_info_result(udids, refresh=False):
+    """Device info for the first attached device, from the profile store when possible"""
+    if not udids:
+        return {'error': 'No device found'}, 200
+    
+    # Known device: answered now, volatile fields refreshed behind the response
+    result = service.device_profile(udid=udids[0], refresh=refresh)
+    info = profile_to_info(result["profile"])
+    # Every background reconcile moves last_seen; leaving it out keeps the
+    # ETag of an unchanged device stable for polling clients
+    info.pop('last_seen', None)
+    if result["cached"]:
+        info['cached'] = True
+    else:
+        # Only an actual device query is logged; polls answered from the
+        # profile store would change the log (and its ETag) on every read
+        log_operation("Get Device Info", "SUCCESS")
+    return info, 200
+
+def mount_status_result(mount_point):
+    return {"mounted": os.path.ismount(mount_point)}, 200
+
+def app_list_result(udid=None, refresh=False):
+    """Raw ifuse --list-apps lines, shared with other frontends for a short while"""
+    result = service.app_list(udid=udid, refresh=refresh)
+    if result["success"]:
+        apps = result["stdout"].strip().split('\n')
+        apps = [app.strip() for app in apps if app.strip()]
+        return {"success": True, "apps": apps}, 200
+    return {"success": False, "error": result["stderr"]}, 400
+
+def logs_result(operation=None, status=None, limit=None):
+    return operation_log.read_all(operation=operation, status=status, limit=limit), 200
+
 # API Routes
 @app.route('/api/check-device', methods=['POST'])
 def check_device():
     """Check if device is paired"""
-    result = run_command("idevicepair validate")
+    result = validate_pairing()
+    record_pairing(result)
     status = "SUCCESS" if result["success"] else "FAILED"
     log_operation("Check Device", status, result["stdout"][:100])
     return jsonify(result)
@@ -85,6 +180,7 @@ def check_device():
 def pair_device():
     """Pair with device"""
     result = run_command("idevicepair pair")
+    record_pairing(result)
     status = "SUCCESS" if result["success"] else "FAILED"
     log_operation("Pair Device", status, result["stdout"][:100])
     return jsonify(result)
@@ -96,7 +192,8 @@ def mount_device():
     mount_point = data.get('mount_point', os.path.expanduser('~/iPhone'))
     
     os.makedirs(mount_point, exist_ok=True)
-    result = run_command(f"ifuse {mount_point}")
+    udids = attached_udids()
+    result = run_command(f"ifuse{ifuse_device_args(udids[0] if udids else None)} {mount_point}")
     status = "SUCCESS" if result["success"] else "FAILED"
     log_operation("Mount Device", status, result["stdout"][:100])
     return jsonify(result)
@@ -118,21 +215,13 @@ def one_click_mount():
     data = request.json
     mount_point = data.get('mount_point', os.path.expanduser('~/iPhone'))
     
-    output = []
     os.makedirs(mount_point, exist_ok=True)
     
-    # Validate
-    result = run_command("idevicepair validate")
-    output.append({"step": "validate", "result": result})
-    
-    # Pair if needed
-    if not result["success"]:
-        result = run_command("idevicepair pair")
-        output.append({"step": "pair", "result": result})
-    
-    # Mount
-    result = run_command(f"ifuse {mount_point}")
-    output.append({"step": "mount", "result": result})
+    # A device validated earlier goes straight to ifuse; validate/pair only
+    # run for unknown devices or when ifuse reports a pairing error
+    udids = attached_udids()
+    udid = udids[0] if udids else None
+    output = mount_with_pairing(f"ifuse{ifuse_device_args(udid)} {mount_point}", run_command, pairing_cache, udid)
     
     success = output[-1]["result"]["success"]
     status = "SUCCESS" if success else "FAILED"
@@ -142,56 +231,9 @@ def one_click_mount():
 
 @app.route('/api/device-info', methods=['GET'])
 def get_device_info():
-    """Get device information"""
-    info = {}
-    
-    # Get device UDID
-    result = run_command("idevice_id -l")
-    if result["success"] and result["stdout"].strip():
-        device_id = result["stdout"].strip().split('\n')[0]
-        info['udid'] = device_id
-        
-        # Get device name
-        result = run_command(f"idevicename -u {device_id}")
-        if result["success"]:
-            info['name'] = result["stdout"].strip()
-        
-        # Get device class
-        result = run_command(f"ideviceinfo -u {device_id} -k DeviceClass")
-        if result["success"]:
-            info['class'] = result["stdout"].strip()
-        
-        # Get product type
-        result = run_command(f"ideviceinfo -u {device_id} -k ProductType")
-        if result["success"]:
-            info['product_type'] = result["stdout"].strip()
-        
-        # Get iOS version
-        result = run_command(f"ideviceinfo -u {device_id} -k ProductVersion")
-        if result["success"]:
-            info['ios_version'] = result["stdout"].strip()
-        
-        # Get storage
-        result = run_command(f"ideviceinfo -u {device_id} -k TotalDiskCapacity")
-        if result["success"]:
-            try:
-                total = int(result["stdout"].strip()) / (1024**3)
-                info['total_storage'] = f"{total:.2f} GB"
-            except:
-                pass
-        
-        result = run_command(f"ideviceinfo -u {device_id} -k FreeDiskSpace")
-        if result["success"]:
-            try:
-                free = int(result["stdout"].strip()) / (1024**3)
-                info['free_storage'] = f"{free:.2f} GB"
-            except:
-                pass
-    else:
-        info['error'] = 'No device found'
-    
-    log_operation("Get Device Info", "SUCCESS")
-    return jsonify(info)
+    """Get device information, answering from the profile store when possible"""
+    body, status = device_info_result(attached_udids(), request.args.get('refresh') == '1')
+    return jsonify(body), status
 
 @app.route('/api/open-folder', methods=['POST'])
 def open_folder():
@@ -199,43 +241,369 @@ def open_folder():
     data = request.json
     mount_point = data.get('mount_point', os.path.expanduser('~/iPhone'))
     
-    if os.path.ismount(mount_point):
+    if is_device_mount(mount_point):
         result = run_command(f"xdg-open {mount_point}")
         log_operation("Open Folder", "SUCCESS" if result["success"] else "FAILED")
         return jsonify(result)
     else:
         return jsonify({"success": False, "stderr": "Device not mounted"}), 400
 
+@app.route('/api/files', methods=['GET'])
+def get_file():
+    """Stream a file from the mount, honouring Range and conditional headers"""
+    mount_point = request.args.get('mount', os.path.expanduser('~/iPhone'))
+    rel_path = request.args.get('path', '')
+    
+    if not is_device_mount(mount_point):
+        return jsonify({"success": False, "stderr": "Device not mounted"}), 400
+    
+    full_path = resolve_mount_path(mount_point, rel_path)
+    if full_path is None:
+        return jsonify({"success": False, "stderr": "Path outside mount point"}), 403
+    if not os.path.isfile(full_path):
+        return jsonify({"success": False, "stderr": "File not found"}), 404
+    
+    # Built by hand rather than with send_file: wsgi.file_wrapper lets servers
+    # such as gunicorn os.sendfile() the body, which would bypass the I/O
+    # scheduler. Werkzeug's FileWrapper reads through it in bulk-sized chunks,
+    # and make_conditional still answers Range and If-None-Match requests.
+    st = os.stat(full_path)
+    name = os.path.basename(full_path)
+    body = FileWrapper(open_scheduled(full_path, priority=BULK), CHUNK_SIZE)
+    response = Response(
+        body,
+        mimetype=mimetypes.guess_type(name)[0] or "application/octet-stream",
+        direct_passthrough=True
+    )
+    response.content_length = st.st_size
+    response.last_modified = st.st_mtime
+    response.cache_control.no_cache = True
+    response.cache_control.max_age = 0
+    response.set_etag(file_etag(st))
+    response.headers.set(
+        "Content-Disposition", "attachment" if request.args.get('download') == '1' else "inline", filename=name
+    )
+    try:
+        response = response.make_conditional(request.environ, accept_ranges=True, complete_length=st.st_size)
+    except RequestedRangeNotSatisfiable:
+        body.close()
+        raise
+    metrics.BYTES_TRANSFERRED.inc(response.content_length or 0, mount=mount_point, direction="download")
+    return response
+
+@app.route('/api/preview', methods=['GET'])
+def get_preview():
+    """Preview a file from a partial read; ?hex=<offset>&rows= adds a hexdump window"""
+    mount_point = request.args.get('mount', os.path.expanduser('~/iPhone'))
+    if not is_device_mount(mount_point):
+        return jsonify({"success": False, "stderr": "Device not mounted"}), 400
+    
+    full_path = resolve_mount_path(mount_point, request.args.get('path', ''))
+    if full_path is None:
+        return jsonify({"success": False, "stderr": "Path outside mount point"}), 403
+    if not os.path.isfile(full_path):
+        return jsonify({"success": False, "stderr": "File not found"}), 404
+    hex_offset = request.args.get('hex', type=int)
+    if hex_offset is not None and hex_offset < 0:
+        return jsonify({"success": False, "stderr": "hex offset must not be negative"}), 400
+    
+    with FileWindow(full_path) as window:
+        result = preview_file(window)
+        if hex_offset is not None:
+            rows = min(request.args.get('rows', 64, type=int), 1024)
+            result["hex"] = hex_rows(window, hex_offset, rows)
+        result["bytes_read"] = window.bytes_read
+    metrics.BYTES_TRANSFERRED.inc(result["bytes_read"], mount=mount_point, direction="download")
+    return jsonify({"success": True, **result})
+
+@app.route('/api/sqlite/query', methods=['POST'])
+def sqlite_query():
+    """Page through a read-only query on a database in the mount
+
+    Body: {mount, path, sql | table, params, offset, limit}. Without sql or
+    table the database's tables are listed.
+    """
+    data = request.json or {}
+    mount_point = data.get('mount', os.path.expanduser('~/iPhone'))
+    if not is_device_mount(mount_point):
+        return jsonify({"success": False, "stderr": "Device not mounted"}), 400
+    
+    full_path = resolve_mount_path(mount_point, data.get('path', ''))
+    if full_path is None:
+        return jsonify({"success": False, "stderr": "Path outside mount point"}), 403
+    if not os.path.isfile(full_path):
+        return jsonify({"success": False, "stderr": "File not found"}), 404
+    
+    try:
+        conn, mode = open_database(full_path)
+    except (OSError, sqlite3.Error) as e:
+        return jsonify({"success": False, "stderr": str(e)}), 400
+    try:
+        sql = data.get('sql') or (table_query(data['table']) if data.get('table') else None)
+        if sql is None:
+            return jsonify({"success": True, "mode": mode, "tables": list_tables(conn)})
+        page = query_page(
+            conn, sql, tuple(data.get('params') or ()),
+            offset=int(data.get('offset', 0)), limit=int(data.get('limit', 200))
+        )
+        return jsonify({"success": True, "mode": mode, **page})
+    except (sqlite3.Error, ValueError, TypeError) as e:
+        return jsonify({"success": False, "stderr": str(e)}), 400
+    finally:
+        conn.close()
+
+@app.route('/api/upload', methods=['GET'])
+def upload_status():
+    """Report how much of an interrupted upload already reached the device"""
+    mount_point = request.args.get('mount', os.path.expanduser('~/iPhone'))
+    full_path = resolve_mount_path(mount_point, request.args.get('path', ''))
+    if full_path is None:
+        return jsonify({"success": False, "stderr": "Path outside mount point"}), 403
+    
+    return jsonify({
+        "success": True,
+        "offset": resume_offset(full_path, upload_identity()),
+        "complete": os.path.isfile(full_path)
+    })
+
+@app.route('/api/upload', methods=['POST'])
+def upload_file():
+    """Write the request body into the mount, resuming at ?offset=
+    
+    ?total= and ?mtime= identify the client's file; a partial upload of
+    a different file is started over instead of resumed.
+    """
+    mount_point = request.args.get('mount', os.path.expanduser('~/iPhone'))
+    rel_path = request.args.get('path', '')
+    total = request.args.get('total', type=int)
+    offset = request.args.get('offset', 0, type=int)
+    identity = upload_identity()
+    
+    if not is_device_mount(mount_point):
+        return jsonify({"success": False, "stderr": "Device not mounted"}), 400
+    
+    full_path = resolve_mount_path(mount_point, rel_path)
+    if full_path is None or full_path == os.path.realpath(mount_point):
+        return jsonify({"success": False, "stderr": "Invalid upload path"}), 403
+    if os.path.isdir(full_path):
+        return jsonify({"success": False, "stderr": "Upload path is a folder"}), 400
+    
+    # Clients must resume exactly where the aligned partial file ends
+    expected = resume_offset(full_path, identity)
+    if offset != expected:
+        return jsonify({"success": False, "stderr": "Offset mismatch", "offset": expected}), 409
+    
+    tmp_path = part_path(full_path)
+    try:
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        prepare_part(full_path, identity)
+        with open(tmp_path, 'ab+', buffering=0) as dst:
+            dst.truncate(offset)
+            received = copy_stream(request.stream, ScheduledFile(dst, tmp_path, BULK))
+        metrics.BYTES_TRANSFERRED.inc(received, mount=mount_point, direction="upload")
+    except OSError as e:
+        log_operation("Upload File", "FAILED", str(e)[:100])
+        return jsonify({"success": False, "stderr": str(e), "offset": resume_offset(full_path, identity)}), 500
+    
+    size = os.path.getsize(tmp_path)
+    if total is not None and size > total:
+        discard_part(full_path)
+        log_operation("Upload File", "FAILED", f"{rel_path}: size mismatch")
+        return jsonify({"success": False, "stderr": f"Received {size} bytes, expected {total}"}), 400
+    
+    complete = total is None or size == total
+    if complete:
+        try:
+            finish_part(full_path)
+        except OSError as e:
+            log_operation("Upload File", "FAILED", str(e)[:100])
+            return jsonify({"success": False, "stderr": str(e)}), 500
+        log_operation("Upload File", "SUCCESS", rel_path[:100])
+    
+    # The next chunk must start where the server will accept it, not at the raw size
+    return jsonify({
+        "success": True, "offset": size if complete else resume_offset(full_path, identity), "complete": complete
+    })
+
+@app.route('/api/export', methods=['GET'])
+def export_archive():
+    """Stream a mounted folder as a zip or tar archive"""
+    mount_point = request.args.get('mount', os.path.expanduser('~/iPhone'))
+    fmt = request.args.get('format', 'zip')
+    
+    if fmt not in FORMATS:
+        return jsonify({"success": False, "stderr": f"Unsupported format: {fmt}"}), 400
+    if not is_device_mount(mount_point):
+        return jsonify({"success": False, "stderr": "Device not mounted"}), 400
+    
+    root = resolve_mount_path(mount_point, request.args.get('path', ''))
+    if root is None or not os.path.isdir(root):
+        return jsonify({"success": False, "stderr": "Folder not found"}), 404
+    
+    name = os.path.basename(root.rstrip(os.sep)) or "device"
+    log_operation("Export Archive", "SUCCESS", f"{name}.{fmt}")
+    mimetype = "application/zip" if fmt == "zip" else "application/x-tar"
+    return Response(
+        stream_with_context(count_bytes(iter_archive(root, fmt), mount_point, "export")),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
+
+@app.route('/api/verify', methods=['POST'])
+def start_verify():
+    """Start a background job comparing a local copy with the mount"""
+    data = request.json
+    mount_point = data.get('mount_point', os.path.expanduser('~/iPhone'))
+    local_path = os.path.expanduser(data.get('local_path', ''))
+    mode = data.get('mode', 'full')
+    
+    if mode not in VERIFY_MODES:
+        return jsonify({"success": False, "stderr": f"Unknown mode: {mode}"}), 400
+    if not is_device_mount(mount_point):
+        return jsonify({"success": False, "stderr": "Device not mounted"}), 400
+    device_root = resolve_mount_path(mount_point, data.get('path', ''))
+    if device_root is None or not os.path.isdir(device_root):
+        return jsonify({"success": False, "stderr": "Folder not found"}), 404
+    if not os.path.isdir(local_path):
+        return jsonify({"success": False, "stderr": "Local folder not found"}), 404
+    
+    def run(job):
+        report = verify_trees(local_path, device_root, mode,
+                              progress=lambda done, total: job.report(done=done, total=total))
+        log_operation("Verify Copy", "SUCCESS" if report["success"] else "FAILED",
+                      f"{len(report['mismatched'])} mismatched, {len(report['missing_local'])} missing")
+        return report
+    
+    job = jobs.start("verify", run, {"local_path": local_path, "device_path": device_root, "mode": mode})
+    return jsonify({"success": True, "job_id": job.id}), 202
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List background jobs"""
+    return jsonify([job.to_dict() for job in jobs.all()])
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status and result of a background job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "stderr": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/backup', methods=['POST'])
+def start_backup():
+    """Start a background job copying every (or the given) app's Documents folder"""
+    data = request.json
+    dest = os.path.expanduser(data.get('dest', ''))
+    concurrency = int(data.get('concurrency', DEFAULT_CONCURRENCY))
+    
+    if not dest:
+        return jsonify({"success": False, "stderr": "No destination given"}), 400
+    udids = attached_udids()
+    udid = udids[0] if udids else None
+    bundle_ids = data.get('bundle_ids')
+    if not bundle_ids:
+        result = service.app_list(udid=udid)
+        if not result["success"]:
+            return jsonify({"success": False, "stderr": "Could not list apps"}), 400
+        bundle_ids = [bundle_id for _, bundle_id in parse_app_list(result["stdout"])]
+    
+    def run(job):
+        backup = AppBackup(bundle_ids, dest, paired_mounter(pairing_cache, udid), udid, concurrency,
+                           progress=lambda state: job.report(**state))
+        summary = backup.run_all()
+        log_operation("Backup Apps", "SUCCESS" if summary["success"] else "FAILED",
+                      f"{summary['done'] - len(summary['failed'])}/{summary['total']} apps to {dest}")
+        return summary
+    
+    job = jobs.start("backup", run, {"dest": dest, "apps": len(bundle_ids), "concurrency": concurrency})
+    return jsonify({"success": True, "job_id": job.id}), 202
+
+@app.route('/api/snapshots', methods=['POST'])
+def take_snapshot():
+    """Start a background job snapshotting a folder on the mount"""
+    data = request.json
+    mount_point = data.get('mount_point', os.path.expanduser('~/iPhone'))
+    mode = data.get('mode', 'metadata')
+    
+    if mode not in SNAPSHOT_MODES:
+        return jsonify({"success": False, "stderr": f"Unknown mode: {mode}"}), 400
+    if not is_device_mount(mount_point):
+        return jsonify({"success": False, "stderr": "Device not mounted"}), 400
+    root = resolve_mount_path(mount_point, data.get('path', ''))
+    if root is None or not os.path.isdir(root):
+        return jsonify({"success": False, "stderr": "Folder not found"}), 404
+    label = data.get('label') or os.path.basename(root.rstrip('/')) or "device"
+    
+    def run(job):
+        snapshot = snapshot_store.take(root, label, mode)
+        snapshot.pop("tree")
+        log_operation("Snapshot", "SUCCESS", f"{snapshot['id']}: {snapshot['files']} files")
+        return snapshot
+    
+    job = jobs.start("snapshot", run, {"root": root, "label": label, "mode": mode})
+    return jsonify({"success": True, "job_id": job.id}), 202
+
+@app.route('/api/snapshots', methods=['GET'])
+def list_snapshots():
+    """List stored snapshots, newest first"""
+    return jsonify(snapshot_store.list(request.args.get('label')))
+
+@app.route('/api/snapshots/diff', methods=['GET'])
+def diff_snapshots():
+    """Report files added, removed and changed between two snapshots"""
+    report = snapshot_store.diff(request.args.get('from', ''), request.args.get('to', ''))
+    if report is None:
+        return jsonify({"success": False, "stderr": "Snapshot not found"}), 404
+    return jsonify(report)
+
 @app.route('/api/is-mounted', methods=['POST'])
 def is_mounted():
     """Check if device is mounted"""
     data = request.json
-    mount_point = data.get('mount_point', os.path.expanduser('~/iPhone'))
-    
-    mounted = os.path.ismount(mount_point)
-    return jsonify({"mounted": mounted})
+    body, status = mount_status_result(data.get('mount_point', os.path.expanduser('~/iPhone')))
+    return jsonify(body), status
 
 @app.route('/api/logs', methods=['GET'])
 def get_logs():
-    """Get operation logs"""
-    if LOG_FILE.exists():
-        try:
-            with open(LOG_FILE, 'r') as f:
-                logs = json.load(f)
-            return jsonify(logs)
-        except Exception as e:
-            return jsonify({"error": str(e)}), 400
-    return jsonify([])
+    """Get operation logs, optionally filtered by ?operation= and ?status="""
+    body, status = logs_result(
+        operation=request.args.get('operation'),
+        status=request.args.get('status'),
+        limit=request.args.get('limit', type=int)
+    )
+    return jsonify(body), status
 
 @app.route('/api/logs', methods=['DELETE'])
 def clear_logs():
     """Clear operation logs"""
     try:
-        LOG_FILE.unlink(missing_ok=True)
+        operation_log.clear()
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Export metrics in Prometheus text format"""
+    return Response(metrics.REGISTRY.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/io', methods=['GET'])
+def io_status():
+    """Report per-device I/O queues and the bulk bandwidth cap"""
+    return jsonify({"success": True, **SCHEDULER.stats()})
+
+@app.route('/api/io', methods=['POST'])
+def set_io_limit():
+    """Set the bulk bandwidth cap in MiB/s; 0 removes it"""
+    data = request.json or {}
+    try:
+        limit = float(data.get('bulk_limit_mib', 0))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "stderr": "bulk_limit_mib must be a number"}), 400
+    SCHEDULER.set_bulk_limit(limit * 1024 * 1024 if limit > 0 else None)
+    return jsonify({"success": True, **SCHEDULER.stats()})
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
@@ -244,13 +612,61 @@ def health():
 @app.route('/api/list-apps', methods=['GET'])
 def list_apps():
     """List available apps on the device"""
-    result = run_command("ifuse --list-apps")
-    if result["success"]:
-        apps = result["stdout"].strip().split('\n')
-        apps = [app.strip() for app in apps if app.strip()]
-        return jsonify({"success": True, "apps": apps})
-    else:
-        return jsonify({"success": False, "error": result["stderr"]}), 400
+    body, status = app_list_result(refresh=request.args.get('refresh') == '1')
+    return jsonify(body), status
+
+def count_param(value):
+    """Optional non-negative integer from a JSON body; ValueError for anything else"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"expected an integer, got {value!r}")
+    count = int(value)
+    if count < 0:
+        raise ValueError(f"expected a non-negative integer, got {count}")
+    return count
+
+# Read operations available to /api/batch: handler(params, udids) -> (body, status)
+BATCH_OPERATIONS = {
+    "device-info": lambda params, udids: device_info_result(udids(), bool(params.get('refresh'))),
+    "is-mounted": lambda params, udids: mount_status_result(
+        params.get('mount_point', os.path.expanduser('~/iPhone'))
+    ),
+    "list-apps": lambda params, udids: app_list_result(next(iter(udids()), None)),
+    "logs": lambda params, udids: logs_result(params.get('operation'), params.get('status'), count_param(params.get('limit'))),
+    "jobs": lambda params, udids: ([job.to_dict() for job in jobs.all()], 200),
+}
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Run several read operations in one round trip, looking up devices once"""
+    data = request.json or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list):
+        return jsonify({"success": False, "stderr": "operations must be a list"}), 400
+    
+    attached = []
+    def udids():
+        if not attached:
+            attached.append(attached_udids())
+        return attached[0]
+    
+    results = []
+    for params in operations:
+        op = params.get('op') if isinstance(params, dict) else None
+        handler = BATCH_OPERATIONS.get(op) if isinstance(op, str) else None
+        if handler is None:
+            results.append({"op": op, "status": 400, "body": {"success": False, "stderr": f"Unknown operation: {op}"}})
+            continue
+        # One failing operation must not take the rest of the batch down with it
+        try:
+            body, status = handler(params, udids)
+        except (TypeError, ValueError) as e:
+            body, status = {"success": False, "stderr": f"Invalid parameters: {e}"}, 400
+        except Exception as e:
+            body, status = {"success": False, "stderr": str(e)}, 500
+        results.append({"op": op, "status": status, "body": body})
+    return jsonify({"success": True, "results": results})
 
 @app.route('/api/mount-app', methods=['POST'])
 def mount_app():
@@ -260,10 +676,14 @@ def mount_app():
     mount_point = data.get('mount_point', os.path.expanduser('~/iPhone_Apps/app'))
     
     os.makedirs(mount_point, exist_ok=True)
-    result = run_command(f"ifuse --documents {bundle_id} {mount_point}")
+    udids = attached_udids()
+    result = run_command(f"ifuse{ifuse_device_args(udids[0] if udids else None)} --documents {bundle_id} {mount_point}")
     status = "SUCCESS" if result["success"] else "FAILED"
     log_operation(f"Mount App {bundle_id}", status, result["stdout"][:100])
     return jsonify(result)
 
 if __name__ == '__main__':
+    tracing.configure_from_args(sys.argv[1:])
+    if service.local is None:
+        print("Another process already serves device queries on this host")
     app.run(host='127.0.0.1', port=5000, debug=False)
@@ -0,0 +1,342 @@
+"""
+iOS Mount GUI - Device Service
+One owner per host for device queries and their caches
+"""
+
+import fcntl
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+from backend import metrics
+from backend.commands import list_udids, run_command, run_output
+from backend.iosched import SCHEDULER, device_source
+from backend.pairing import PairingCache
+from backend.profiles import DeviceProfileStore, missing_fields, query_device_fields
+
+SOCKET_PATH = Path.home() / ".ios_mount_gui" / "service.sock"
+# Attached devices are re-listed at most this often
+UDID_TTL = 2
+# ifuse --list-apps output is reused for this long
+APP_LIST_TTL = 30
+# Known devices are refreshed in the background at most this often
+RECONCILE_INTERVAL = 30
+# Device queries can take as long as the slowest ideviceinfo call
+CALL_TIMEOUT = 120
+PING_TIMEOUT = 1
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class Coalescer:
+    """Concurrent calls with the same key share one execution and its result"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inflight = {}
+
+    def running(self, key):
+        with self.lock:
+            return key in self.inflight
+
+    def run(self, key, func):
+        with self.lock:
+            call = self.inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self.inflight[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+            call.done.set()
+
+class DeviceService:
+    """Device list, profiles and app lists shared by every frontend
+
+    Results are cached for a short time and concurrent requests for the
+    same thing wait on a single query, so a GUI and the REST backend asking
+    together fork one ideviceinfo or ifuse --list-apps between them. The
+    operation log needs no owner: OperationLog appends are whole lines
+    from any process.
+    """
+
+    # Methods clients may call over the socket
+    EXPOSED = ("udids", "device_profile", "app_list", "invalidate")
+
+    def __init__(self, profile_store=None, pairing_cache=None, run=run_command):
+        self.profile_store = profile_store or DeviceProfileStore()
+        self.pairing_cache = pairing_cache or PairingCache()
+        self.run = run
+        self.coalescer = Coalescer()
+        self.lock = threading.Lock()
+        self.cache = {}
+        self.server = None
+        self.owner_lock = None
+
+    def _cached(self, key, ttl, func, refresh=False, keep=lambda value: True):
+        """func() through the TTL cache and the coalescer"""
+        with self.lock:
+            entry = self.cache.get(key)
+        hit = entry is not None and not refresh and time.monotonic() < entry[0]
+        metrics.record_cache(key[0], hit)
+        if hit:
+            return entry[1]
+
+        def compute():
+            value = func()
+            if keep(value):
+                with self.lock:
+                    self.cache[key] = (time.monotonic() + ttl, value)
+            return value
+        return self.coalescer.run(key, compute)
+
+    def invalidate(self, udid=None):
+        """Drop cached device lists and app lists, for one device or all"""
+        with self.lock:
+            for key in list(self.cache):
+                if udid is None or udid in key[1:]:
+                    del self.cache[key]
+
+    def udids(self, refresh=False):
+        """Attached UDIDs, forgetting pairing state for detached devices"""
+        udids = self._cached(("udids",), UDID_TTL, list_udids, refresh)
+        self.pairing_cache.observe_devices(udids)
+        return udids
+
+    def refresh_profile(self, udid):
+        """Query the fields this device's profile is missing and store them"""
+        def query():
+            with SCHEDULER.interactive(device_source(udid)):
+                fields = missing_fields(self.profile_store.get(udid))
+                return self.profile_store.update(udid, **query_device_fields(udid, fields, run_output))
+        return self.coalescer.run(("profile", udid), query)
+
+    def reconcile(self, udid, last_seen=None):
+        """Refresh a known device's profile in the background unless it is fresh"""
+        if last_seen and time.time() - last_seen < RECONCILE_INTERVAL:
+            return
+        if self.coalescer.running(("profile", udid)):
+            return
+        threading.Thread(target=self.refresh_profile, args=(udid,), daemon=True, name="reconcile").start()
+
+    def device_profile(self, udid=None, refresh=False):
+        """{"profile", "cached"} for udid or the first attached device
+
+        A known device is answered from the profile store and reconciled
+        in the background; refresh=True waits for the device instead.
+        profile is None when no device is attached.
+        """
+        if udid is None:
+            udids = self.udids()
+            if not udids:
+                return {"profile": None, "cached": False}
+            udid = udids[0]
+        profile = self.profile_store.get(udid)
+        metrics.record_cache("device_profile", profile is not None)
+        if profile and not refresh:
+            self.reconcile(udid, profile["last_seen"])
+            return {"profile": profile, "cached": True}
+        return {"profile": self.refresh_profile(udid), "cached": False}
+
+    def app_list(self, udid=None, refresh=False):
+        """ifuse --list-apps as a run_command result; only successful listings are cached"""
+        device_arg = f" -u {udid}" if udid else ""
+        return self._cached(
+            ("app_list", udid), APP_LIST_TTL, lambda: self.run(f"ifuse{device_arg} --list-apps"),
+            refresh, keep=lambda result: result["success"]
+        )
+
+    def serve(self, path=SOCKET_PATH):
+        """Answer other frontends on a UNIX socket; False if another process already does
+
+        The owner is whoever holds an flock on <socket>.lock. The kernel
+        drops it when the owner exits, however it exits, so exactly one
+        live process serves the socket and a successor can take over.
+        """
+        path = str(path)
+        lock = open(path + ".lock", 'a')
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return False
+        try:
+            # Only the lock holder removes a socket left behind by a dead owner
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            # Created owner-only, since clients can trigger device queries
+            old_umask = os.umask(0o177)
+            try:
+                self.server = _SocketServer(path, self)
+            finally:
+                os.umask(old_umask)
+        except OSError:
+            lock.close()
+            raise
+        self.owner_lock = lock
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="device-service").start()
+        return True
+
+    def close(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            try:
+                os.unlink(self.server.server_address)
+            except OSError:
+                pass
+            self.server = None
+        if self.owner_lock:
+            self.owner_lock.close()
+            self.owner_lock = None
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One JSON request per line: {"method", "params"} -> {"result"} or {"error"}"""
+
+    def handle(self):
+        service = self.server.service
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                method = request.get("method")
+                if method == "ping":
+                    response = {"result": os.getpid()}
+                elif method in service.EXPOSED:
+                    response = {"result": getattr(service, method)(**request.get("params", {}))}
+                else:
+                    response = {"error": f"Unknown method: {method}"}
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+class _SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        self.service = service
+        super().__init__(path, _Handler)
+
+class ServiceError(Exception):
+    """The running service answered a call with an error"""
+
+class ServiceClient:
+    """DeviceService methods answered by the process that owns the socket"""
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = str(path)
+
+    def call(self, method, timeout=CALL_TIMEOUT, **params):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(self.path)
+            with sock.makefile('rwb') as stream:
+                stream.write((json.dumps({"method": method, "params": params}) + "\n").encode())
+                stream.flush()
+                response = json.loads(stream.readline())
+        if "error" in response:
+            raise ServiceError(response["error"])
+        return response["result"]
+
+    def ping(self):
+        """True when a live service answers on the socket"""
+        try:
+            self.call("ping", timeout=PING_TIMEOUT)
+            return True
+        except (OSError, ValueError, ServiceError):
+            return False
+
+    def __getattr__(self, name):
+        if name not in DeviceService.EXPOSED:
+            raise AttributeError(name)
+        return lambda **params: self.call(name, **params)
+
+class SharedService:
+    """The host's DeviceService, through whichever process owns the socket
+
+    Calls go to the owner over the socket while it answers. When it has
+    gone away this process embeds a DeviceService (built with the given
+    keyword arguments) and serves the socket in its place, so frontends
+    outlive the one that started first. Attached devices listed by the
+    owner are also shown to the local pairing cache, which would
+    otherwise never hear that a device was unplugged.
+    """
+
+    def __init__(self, path=SOCKET_PATH, **embedded):
+        self.path = str(path)
+        self.embedded = embedded
+        self.client = ServiceClient(path)
+        self.local = None
+        self.lock = threading.Lock()
+
+    def take_over(self):
+        """Embed and serve the service unless another process owns the socket"""
+        with self.lock:
+            if self.local is not None:
+                return
+            service = DeviceService(**self.embedded)
+            try:
+                if not service.serve(self.path):
+                    return
+            except OSError:
+                # The socket cannot be served at all; this process answers its own queries
+                pass
+            self.local = service
+
+    def call(self, method, **params):
+        if self.local is None:
+            try:
+                return self.client.call(method, **params)
+            except OSError:
+                # A slow owner timing out is still the owner
+                if self.client.ping():
+                    raise
+                self.take_over()
+                if self.local is None:
+                    return self.client.call(method, **params)
+        return getattr(self.local, method)(**params)
+
+    def udids(self, refresh=False):
+        udids = self.call("udids", refresh=refresh)
+        if self.local is None and "pairing_cache" in self.embedded:
+            self.embedded["pairing_cache"].observe_devices(udids)
+        return udids
+
+    def device_profile(self, udid=None, refresh=False):
+        # Resolved here so the device list passes through udids() above
+        if udid is None:
+            udids = self.udids()
+            if not udids:
+                return {"profile": None, "cached": False}
+            udid = udids[0]
+        return self.call("device_profile", udid=udid, refresh=refresh)
+
+    def __getattr__(self, name):
+        if name not in DeviceService.EXPOSED:
+            raise AttributeError(name)
+        return lambda **params: self.call(name, **params)
+
+def connect_service(path=SOCKET_PATH, **embedded):
+    """The host's device service, embedded and served here if nobody serves it yet"""
+    service = SharedService(path, **embedded)
+    service.take_over()
+    return service
@@ -0,0 +1,207 @@
+"""
+iOS Mount GUI - Container Snapshots
+Merkle trees of a mounted directory for quick "what changed" diffs
+"""
+
+import hashlib
+import json
+import os
+import re
+import stat
+import time
+from pathlib import Path
+
+from backend.iosched import METADATA, SCHEDULER
+from backend.verify import full_digest
+
+SNAPSHOT_DIR = Path.home() / ".ios_mount_gui" / "snapshots"
+MODES = ("metadata", "content")
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _file_node(path, st, mode, previous):
+    node = {"type": "file", "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    unchanged = previous and previous["type"] == "file" and \
+        previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns
+    if mode == "content":
+        # Only files whose metadata moved are read again
+        if unchanged and previous.get("content"):
+            node["content"] = previous["content"]
+        else:
+            node["content"] = full_digest(path)
+    if unchanged and previous.get("content") == node.get("content"):
+        return previous
+    node["digest"] = _digest("file", st.st_size, st.st_mtime_ns, node.get("content", ""))
+    return node
+
+def build_tree(path, mode="metadata", previous=None, stats=None):
+    """Merkle node for path, reusing nodes from previous where nothing changed
+
+    A directory whose mtime is unchanged keeps its previous child names, so
+    its entries are stat()ed but the directory is not listed again. stats
+    collects counts of listed, reused and hashed entries.
+    """
+    stats = stats if stats is not None else {"listed": 0, "reused": 0, "entries": 0}
+    st = os.lstat(path)
+    prev_children = previous.get("children", {}) if previous and previous["type"] == "dir" else {}
+
+    with SCHEDULER.request(path, METADATA):
+        if previous and previous["type"] == "dir" and previous["mtime_ns"] == st.st_mtime_ns:
+            names = list(prev_children)
+        else:
+            names = sorted(os.listdir(path))
+            stats["listed"] += 1
+        child_stats = {}
+        for name in names:
+            try:
+                child_stats[name] = os.lstat(os.path.join(path, name))
+            except OSError:
+                continue
+
+    children = {}
+    for name, child_st in child_stats.items():
+        child_path = os.path.join(path, name)
+        prev = prev_children.get(name)
+        stats["entries"] += 1
+        if stat.S_ISDIR(child_st.st_mode):
+            node = build_tree(child_path, mode, prev if prev and prev["type"] == "dir" else None, stats)
+        elif stat.S_ISREG(child_st.st_mode):
+            try:
+                node = _file_node(child_path, child_st, mode, prev)
+            except OSError:
+                continue
+        else:
+            continue
+        if node is prev:
+            stats["reused"] += 1
+        children[name] = node
+
+    digest = _digest("dir", *(f"{name}:{children[name]['digest']}" for name in sorted(children)))
+    if previous and previous["type"] == "dir" and previous["digest"] == digest \
+            and previous["mtime_ns"] == st.st_mtime_ns:
+        return previous
+    return {"type": "dir", "mtime_ns": st.st_mtime_ns, "digest": digest, "children": children}
+
+def _count_files(node):
+    if node["type"] == "file":
+        return 1
+    return sum(_count_files(child) for child in node["children"].values())
+
+def diff_trees(old, new, path="", report=None):
+    """Compare two trees, descending only where digests differ
+
+    Returns {"added", "removed", "changed", "skipped"} where skipped counts
+    subtrees whose equal digests let the walk stop early.
+    """
+    if report is None:
+        report = {"added": [], "removed": [], "changed": [], "skipped": 0}
+    if old["digest"] == new["digest"]:
+        report["skipped"] += 1
+        return report
+    if old["type"] == "file" and new["type"] == "file":
+        report["changed"].append({"path": path, "old_size": old["size"], "new_size": new["size"]})
+        return report
+    if old["type"] != new["type"]:
+        _report_entry(report["removed"], path, old)
+        _report_entry(report["added"], path, new)
+        return report
+
+    for name in sorted(old["children"].keys() | new["children"].keys()):
+        child_path = f"{path}/{name}" if path else name
+        if name not in new["children"]:
+            _report_entry(report["removed"], child_path, old["children"][name])
+        elif name not in old["children"]:
+            _report_entry(report["added"], child_path, new["children"][name])
+        else:
+            diff_trees(old["children"][name], new["children"][name], child_path, report)
+    return report
+
+def _report_entry(entries, path, node):
+    if node["type"] == "dir":
+        entries.append({"path": path + "/", "files": _count_files(node)})
+    else:
+        entries.append({"path": path, "size": node["size"]})
+
+def _safe_label(label):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", label) or "default"
+
+class SnapshotStore:
+    """Snapshots saved as JSON files, grouped by label (usually a bundle ID)"""
+
+    def __init__(self, path=SNAPSHOT_DIR):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, snapshot_id):
+        label, _, stamp = snapshot_id.rpartition("@")
+        return self.path / _safe_label(label) / f"{_safe_label(stamp)}.json"
+
+    def load(self, snapshot_id):
+        """Snapshot with its tree, or None"""
+        try:
+            with open(self._file(snapshot_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list(self, label=None):
+        """Snapshot summaries, newest first"""
+        dirs = [self.path / _safe_label(label)] if label else [p for p in self.path.iterdir() if p.is_dir()]
+        summaries = []
+        for directory in dirs:
+            for file in directory.glob("*.json"):
+                try:
+                    with open(file) as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                snapshot.pop("tree", None)
+                summaries.append(snapshot)
+        return sorted(summaries, key=lambda s: s["created"], reverse=True)
+
+    def latest(self, label):
+        summaries = self.list(label)
+        return self.load(summaries[0]["id"]) if summaries else None
+
+    def take(self, root, label, mode="metadata"):
+        """Snapshot root, reusing the latest snapshot with the same label and mode"""
+        if mode not in MODES:
+            raise ValueError(f"Unknown snapshot mode: {mode}")
+        previous = self.latest(label)
+        previous_tree = previous["tree"] if previous and previous["mode"] == mode else None
+        stats = {"listed": 0, "reused": 0, "entries": 0}
+        start = time.time()
+        tree = build_tree(root, mode, previous_tree, stats)
+        created = time.time()
+        snapshot = {
+            "id": f"{label}@{int(created * 1000)}",
+            "label": label,
+            "root": root,
+            "mode": mode,
+            "created": created,
+            "duration": created - start,
+            "digest": tree["digest"],
+            "files": _count_files(tree),
+            "stats": stats,
+            "tree": tree,
+        }
+        file = self._file(snapshot["id"])
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = file.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, file)
+        return snapshot
+
+    def diff(self, old_id, new_id):
+        """Diff two stored snapshots; None if either is missing"""
+        old, new = self.load(old_id), self.load(new_id)
+        if old is None or new is None:
+            return None
+        report = diff_trees(old["tree"], new["tree"])
+        return {"from": old_id, "to": new_id, **report}
@@ -0,0 +1,139 @@
+"""
+iOS Mount GUI - SQLite Inspector
+Read-only access to app databases in place on the mount
+"""
+
+import hashlib
+import itertools
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+from urllib.parse import quote
+
+from backend.transfer import copy_file
+
+SNAPSHOT_DIR = Path.home() / ".ios_mount_gui" / "sqlite_snapshots"
+# Snapshots of WAL databases kept on disk for reuse
+KEEP_SNAPSHOTS = 4
+DEFAULT_PAGE = 200
+MAX_PAGE = 5000
+# Longest blob prefix rendered as hex
+BLOB_PREVIEW = 32
+DATABASE_EXTENSIONS = (".sqlite", ".sqlite3", ".db", ".sqlitedb", ".storedata")
+
+# Statements a read-only inspector needs; everything else (ATTACH included) is refused
+ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_PRAGMA, sqlite3.SQLITE_RECURSIVE,
+}
+
+def is_database(path):
+    return path.lower().endswith(DATABASE_EXTENSIONS)
+
+def has_wal(path):
+    """True when uncheckpointed WAL frames exist, which immutable mode would ignore"""
+    try:
+        return os.path.getsize(path + "-wal") > 0
+    except OSError:
+        return False
+
+def _authorize(action, *args):
+    return sqlite3.SQLITE_OK if action in ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+def _snapshot_key(path):
+    h = hashlib.blake2b(os.path.realpath(path).encode(), digest_size=12)
+    for name in (path, path + "-wal"):
+        st = os.stat(name)
+        h.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+def snapshot(path, snapshot_dir=SNAPSHOT_DIR):
+    """Copy a WAL database and its log locally, reusing an unchanged earlier copy"""
+    target = Path(snapshot_dir) / _snapshot_key(path)
+    db_path = target / os.path.basename(path)
+    if not db_path.exists():
+        target.mkdir(parents=True, exist_ok=True)
+        # Sequential chunked copies through the bulk scheduler, no random page reads
+        for suffix in ("", "-wal"):
+            result = copy_file(path + suffix, str(db_path) + suffix)
+            if not result["success"]:
+                shutil.rmtree(target, ignore_errors=True)
+                raise OSError(result["error"])
+        _prune_snapshots(Path(snapshot_dir))
+    os.utime(target)
+    return str(db_path)
+
+def _prune_snapshots(snapshot_dir):
+    snapshots = sorted(snapshot_dir.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in snapshots[KEEP_SNAPSHOTS:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+def open_database(path, snapshot_dir=SNAPSHOT_DIR):
+    """Open path read-only, returning (connection, mode)
+
+    Databases without pending WAL frames are opened in place with
+    immutable=1, so SQLite reads only the pages a query touches and takes
+    no locks on the mount. With a WAL present the database and log are
+    snapshotted locally first, since immutable mode would ignore the log.
+    """
+    if has_wal(path):
+        conn = sqlite3.connect(snapshot(path, snapshot_dir), check_same_thread=False)
+        mode = "snapshot"
+    else:
+        uri = f"file:{quote(os.path.abspath(path))}?mode=ro&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        mode = "immutable"
+    conn.execute("PRAGMA query_only = ON")
+    conn.set_authorizer(_authorize)
+    return conn, mode
+
+def list_tables(conn):
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name"
+    ).fetchall()
+    return [row[0] for row in rows]
+
+def format_value(value):
+    """Render a column value for JSON and table cells"""
+    if isinstance(value, bytes):
+        head = value[:BLOB_PREVIEW].hex()
+        return f"x'{head}{'...' if len(value) > BLOB_PREVIEW else ''}' ({len(value)} bytes)"
+    return value
+
+def table_query(table):
+    quoted = table.replace('"', '""')
+    return f'SELECT * FROM "{quoted}"'
+
+def clean_sql(sql):
+    sql = sql.strip().rstrip(";").strip()
+    if not sql:
+        raise ValueError("Empty query")
+    return sql
+
+def execute(conn, sql, params=()):
+    """Cursor over a query, for callers that page by fetching as they scroll"""
+    return conn.execute(clean_sql(sql), params)
+
+def query_page(conn, sql, params=(), offset=0, limit=DEFAULT_PAGE):
+    """One page of a SELECT, stepping past offset rows without returning them
+
+    Returns {"columns", "rows", "offset", "has_more"}.
+    """
+    limit = max(1, min(limit, MAX_PAGE))
+    sql = clean_sql(sql)
+    if sql.split(None, 1)[0].lower() == "pragma":
+        # PRAGMAs cannot be wrapped in a subquery; their results are small anyway
+        cursor = conn.execute(sql, params)
+        rows = list(itertools.islice(cursor, offset, offset + limit + 1))
+    else:
+        # SQLite steps over the skipped rows without handing them back
+        cursor = conn.execute(f"SELECT * FROM ({sql}) LIMIT ? OFFSET ?", (*params, limit + 1, offset))
+        rows = cursor.fetchmany(limit + 1)
+    return {
+        # Statements such as PRAGMA x=y have no result set and no description
+        "columns": [column[0] for column in cursor.description or ()],
+        "rows": [[format_value(value) for value in row] for row in rows[:limit]],
+        "offset": offset,
+        "has_more": len(rows) > limit,
+    }
@@ -0,0 +1,119 @@
+"""
+iOS Mount GUI - UI Stall Detector
+Watchdog that notices when the GUI thread stops turning over and records what it was doing
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+
+from backend import metrics
+
+# Stall threshold in milliseconds; 0 turns the watchdog off
+STALL_ENV = "IOS_MOUNT_STALL_MS"
+DEFAULT_THRESHOLD = 0.25
+# How often the GUI thread should check in
+HEARTBEAT_INTERVAL = 0.05
+# Innermost frames kept from the captured stack
+MAX_FRAMES = 30
+KEEP_STALLS = 100
+
+UI_STALLS = metrics.REGISTRY.histogram(
+    "ios_mount_ui_stall_seconds", "GUI event loop stalls by the action that caused them", ("action",),
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+def threshold_from_env():
+    """Stall threshold in seconds from IOS_MOUNT_STALL_MS, or None when disabled"""
+    try:
+        millis = float(os.environ.get(STALL_ENV, DEFAULT_THRESHOLD * 1000))
+    except ValueError:
+        millis = DEFAULT_THRESHOLD * 1000
+    return millis / 1000 if millis > 0 else None
+
+def format_stall(stall):
+    """Multi-line description used as the operation log details"""
+    lines = [f"Event loop blocked for {stall['duration'] * 1000:.0f} ms in {stall['action']}", ""]
+    lines.extend(stall["stack"])
+    return "\n".join(lines)
+
+class StallWatchdog:
+    """Detect event loop stalls on the thread that creates the watchdog
+
+    The watched thread calls beat() from a timer. When no beat arrives
+    within threshold seconds, the watchdog thread captures the watched
+    thread's Python stack. The next beat closes the stall, records it
+    with its full duration and hands it to on_stall on the watched thread.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, on_stall=None):
+        self.threshold = threshold
+        self.on_stall = on_stall
+        self.thread_id = threading.get_ident()
+        # Frames already on the stack (main(), __init__...) are not the stalled action
+        self.entry_codes = set()
+        frame = sys._getframe(1)
+        while frame is not None:
+            self.entry_codes.add(frame.f_code)
+            frame = frame.f_back
+        self.lock = threading.Lock()
+        self.last_beat = time.monotonic()
+        self.pending = None
+        self.stalls = deque(maxlen=KEEP_STALLS)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        self.thread = threading.Thread(target=self._watch, daemon=True, name="stall-watchdog")
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def beat(self):
+        """Check in from the watched thread, recording a stall that just ended"""
+        now = time.monotonic()
+        with self.lock:
+            pending, self.pending = self.pending, None
+            duration = now - self.last_beat
+            self.last_beat = now
+        if pending is None:
+            return
+        stall = {**pending, "duration": duration}
+        self.stalls.append(stall)
+        UI_STALLS.observe(duration, action=stall["action"])
+        if self.on_stall:
+            self.on_stall(stall)
+
+    def _watch(self):
+        # monotonic() does not advance while the machine sleeps, so suspend is not a stall
+        while not self.stopped.wait(self.threshold / 2):
+            with self.lock:
+                if self.pending is None and time.monotonic() - self.last_beat > self.threshold:
+                    self.pending = self.capture()
+
+    def capture(self):
+        """Stack and action of the watched thread as it is right now"""
+        frame = sys._current_frames().get(self.thread_id)
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        action = next(
+            (getattr(f.f_code, "co_qualname", f.f_code.co_name) for f in frames if f.f_code not in self.entry_codes),
+            "event loop (native code)",
+        )
+        summary = traceback.StackSummary.extract(
+            ((f, f.f_lineno) for f in frames[-MAX_FRAMES:]), capture_locals=False
+        )
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "action": action,
+            "stack": [line.rstrip("\n") for line in summary.format()],
+        }
@@ -0,0 +1,116 @@
+"""
+iOS Mount GUI - Tracing and Profiling Hooks
+Opt-in timed spans written as a Chrome/Perfetto trace file
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+TRACE_ENV = "IOS_MOUNT_TRACE"
+PROFILE_ENV = "IOS_MOUNT_PROFILE"
+PROFILE_DIR = Path.home() / ".ios_mount_gui"
+
+_lock = threading.Lock()
+_events = []
+_thread_names = {}
+_trace_path = None
+_profile_action = None
+_origin = time.perf_counter()
+
+def enabled():
+    """True when spans are being recorded"""
+    return _trace_path is not None
+
+def configure(trace_path=None, profile_action=None):
+    """Turn tracing on, writing the trace to trace_path at exit"""
+    global _trace_path, _profile_action
+    if trace_path and _trace_path is None:
+        atexit.register(write_trace)
+    _trace_path = trace_path or _trace_path
+    _profile_action = profile_action or _profile_action
+
+def configure_from_args(argv):
+    """Apply --trace/--profile flags and environment, returning the other args"""
+    remaining = []
+    trace_path = os.environ.get(TRACE_ENV)
+    profile_action = os.environ.get(PROFILE_ENV)
+    args = iter(argv)
+    for arg in args:
+        if arg == "--trace":
+            trace_path = next(args, None)
+        elif arg.startswith("--trace="):
+            trace_path = arg.split("=", 1)[1]
+        elif arg == "--profile":
+            profile_action = next(args, None)
+        elif arg.startswith("--profile="):
+            profile_action = arg.split("=", 1)[1]
+        else:
+            remaining.append(arg)
+    if profile_action and not trace_path:
+        trace_path = str(PROFILE_DIR / "trace.json")
+    configure(trace_path, profile_action)
+    return remaining
+
+def _micros(t):
+    return int((t - _origin) * 1_000_000)
+
+def _add(event):
+    event.setdefault("pid", os.getpid())
+    event.setdefault("tid", threading.get_native_id())
+    with _lock:
+        _thread_names[event["tid"]] = threading.current_thread().name
+        _events.append(event)
+
+def record_span(name, cat, start, end, **args):
+    """Record a completed span from perf_counter() start/end times"""
+    if not enabled():
+        return
+    _add({"name": name, "cat": cat, "ph": "X", "ts": _micros(start), "dur": _micros(end) - _micros(start), "args": args})
+
+def instant(name, cat, **args):
+    """Record a point-in-time event"""
+    if not enabled():
+        return
+    _add({"name": name, "cat": cat, "ph": "i", "s": "t", "ts": _micros(time.perf_counter()), "args": args})
+
+@contextmanager
+def span(name, cat="app", **args):
+    """Time the enclosed block, profiling it if it is the chosen action"""
+    if not enabled():
+        yield
+        return
+    profiler = None
+    if name == _profile_action:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        if profiler:
+            profiler.disable()
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            profiler.dump_stats(str(PROFILE_DIR / f"profile-{name}-{stamp}.prof"))
+        record_span(name, cat, start, end, **args)
+
+def write_trace(path=None):
+    """Write recorded events in Chrome trace event format"""
+    path = path or _trace_path
+    if not path:
+        return
+    with _lock:
+        events = list(_events)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in _thread_names.items()
+        ]
+    with open(path, 'w') as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,160 @@
+"""
+iOS Mount GUI - File Transfer Engine
+Chunked, resumable copies through an ifuse mount
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backend.iosched import BULK, open_scheduled
+
+# 1 MiB buffers keep AFC round trips low and stay page aligned
+CHUNK_SIZE = 1024 * 1024
+# Flush to the device every 64 MiB instead of after every write
+FSYNC_INTERVAL = 64 * CHUNK_SIZE
+PART_SUFFIX = ".part"
+# Sidecar naming the source a .part file was written from
+SOURCE_SUFFIX = ".src"
+DEFAULT_WORKERS = 3
+
+def part_path(dest_path):
+    """Path of the in-progress file used for resumable writes"""
+    return dest_path + PART_SUFFIX
+
+def source_path(dest_path):
+    """Path of the sidecar recording which source the .part file holds"""
+    return part_path(dest_path) + SOURCE_SUFFIX
+
+def source_identity(size, mtime_ns=None):
+    """Identity a .part file must match to be resumed: source size and mtime"""
+    return ":".join("" if value is None else str(value) for value in (size, mtime_ns))
+
+def _stored_identity(dest_path):
+    try:
+        with open(source_path(dest_path)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def resume_offset(dest_path, identity=None):
+    """Return the aligned offset an interrupted transfer can resume from
+
+    With an identity, a .part file written from any other source (or one
+    with no record of its source) resumes from 0.
+    """
+    if identity is not None and _stored_identity(dest_path) != identity:
+        return 0
+    try:
+        size = os.path.getsize(part_path(dest_path))
+    except OSError:
+        return 0
+    return size - (size % CHUNK_SIZE)
+
+def discard_part(dest_path):
+    """Remove a .part file and its source record"""
+    for path in (part_path(dest_path), source_path(dest_path)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def prepare_part(dest_path, identity):
+    """Resume offset for identity, starting over if the .part holds another source
+
+    A stale .part would otherwise be spliced with the new source and still
+    pass the final size check.
+    """
+    if _stored_identity(dest_path) != identity:
+        discard_part(dest_path)
+        with open(source_path(dest_path), 'w') as f:
+            f.write(identity)
+        return 0
+    return resume_offset(dest_path)
+
+def finish_part(dest_path):
+    """Move a complete .part file into place and drop its source record"""
+    os.replace(part_path(dest_path), dest_path)
+    try:
+        os.remove(source_path(dest_path))
+    except FileNotFoundError:
+        pass
+
+def copy_stream(src, dst, progress=None):
+    """Copy src into dst with one reusable buffer, fsyncing in batches"""
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
+    written = 0
+    unsynced = 0
+    while True:
+        n = src.readinto(buf)
+        if not n:
+            break
+        dst.write(view[:n])
+        written += n
+        unsynced += n
+        if unsynced >= FSYNC_INTERVAL:
+            dst.flush()
+            os.fsync(dst.fileno())
+            unsynced = 0
+        if progress:
+            progress(n)
+    dst.flush()
+    os.fsync(dst.fileno())
+    return written
+
+def copy_file(source, dest_path, progress=None):
+    """Copy one file, resuming a .part file of the same source and verifying its size"""
+    st = os.stat(source)
+    total = st.st_size
+    tmp_path = part_path(dest_path)
+    offset = min(prepare_part(dest_path, source_identity(total, st.st_mtime_ns)), total)
+
+    with open_scheduled(source, 'rb', BULK) as src, open_scheduled(tmp_path, 'ab+', BULK) as dst:
+        # Drop any unaligned tail left by the interrupted run
+        dst.truncate(offset)
+        src.seek(offset)
+        if progress and offset:
+            progress(offset)
+        copy_stream(src, dst, progress)
+
+    actual = os.path.getsize(tmp_path)
+    if actual != total:
+        return {
+            "source": source,
+            "dest": dest_path,
+            "success": False,
+            "bytes": actual,
+            "error": f"Size mismatch after write ({actual} != {total})"
+        }
+    finish_part(dest_path)
+    return {"source": source, "dest": dest_path, "success": True, "bytes": total, "resumed_from": offset}
+
+def copy_pairs(pairs, max_workers=DEFAULT_WORKERS, progress=None):
+    """Copy (source, dest) pairs with a bounded number of files in flight"""
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(copy_file, source, dest, progress): source for source, dest in pairs}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"source": futures[future], "success": False, "bytes": 0, "error": str(e)})
+    return results
+
+def copy_files(sources, dest_dir, max_workers=DEFAULT_WORKERS, progress=None):
+    """Copy several files into dest_dir"""
+    os.makedirs(dest_dir, exist_ok=True)
+    pairs = [(source, os.path.join(dest_dir, os.path.basename(source))) for source in sources]
+    return copy_pairs(pairs, max_workers, progress)
+
+def copy_tree(source_dir, dest_dir, max_workers=DEFAULT_WORKERS, progress=None):
+    """Mirror source_dir into dest_dir, copying files with a bounded pool"""
+    pairs = []
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        target_dir = os.path.join(dest_dir, os.path.relpath(dirpath, source_dir))
+        os.makedirs(target_dir, exist_ok=True)
+        for name in filenames:
+            source = os.path.join(dirpath, name)
+            if os.path.isfile(source) and not os.path.islink(source):
+                pairs.append((source, os.path.join(target_dir, name)))
+    return copy_pairs(pairs, max_workers, progress)
@@ -0,0 +1,116 @@
+"""
+iOS Mount GUI - Copy Verification
+Compares a local tree with a mounted container using parallel hashing
+"""
+
+import hashlib
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.iosched import BULK, open_scheduled
+from backend.transfer import CHUNK_SIZE
+
+MODES = ("full", "sampled")
+# hashlib releases the GIL on large updates, so threads hash in parallel
+HASH_BUFFER = 4 * CHUNK_SIZE
+SAMPLE_BLOCK = 64 * 1024
+SAMPLE_COUNT = 8
+DEFAULT_WORKERS = 4
+
+def full_digest(path):
+    """BLAKE2b of the whole file, streamed through one reusable buffer"""
+    h = hashlib.blake2b()
+    buf = bytearray(HASH_BUFFER)
+    view = memoryview(buf)
+    with open_scheduled(path, 'rb', BULK) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()
+
+def sample_offsets(size):
+    """Head, tail and pseudo-random block offsets, identical for equal sizes"""
+    if size <= SAMPLE_BLOCK * (SAMPLE_COUNT + 2):
+        return [0]
+    rng = random.Random(size)
+    last = size - SAMPLE_BLOCK
+    middle = sorted(rng.randrange(SAMPLE_BLOCK, last) for _ in range(SAMPLE_COUNT))
+    return [0] + middle + [last]
+
+def sampled_digest(path):
+    """Digest of size plus head, tail and random blocks, for multi-GB media"""
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(str(size).encode())
+    with open_scheduled(path, 'rb', BULK) as f:
+        offsets = sample_offsets(size)
+        length = size if offsets == [0] else SAMPLE_BLOCK
+        for offset in offsets:
+            f.seek(offset)
+            h.update(f.read(length))
+    return h.hexdigest()
+
+def file_digest(path, mode="full"):
+    return sampled_digest(path) if mode == "sampled" else full_digest(path)
+
+def list_files(root):
+    """Map of relative path -> size for every regular file under root"""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in filenames:
+            full_path = os.path.join(dirpath, name)
+            if os.path.isfile(full_path) and not os.path.islink(full_path):
+                files[os.path.relpath(full_path, root)] = os.path.getsize(full_path)
+    return files
+
+def verify_trees(local_root, device_root, mode="full", max_workers=DEFAULT_WORKERS, progress=None):
+    """Compare local_root against device_root and report differences
+
+    progress(done, total) is called as each file pair is checked.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown verify mode: {mode}")
+    local = list_files(local_root)
+    device = list_files(device_root)
+
+    mismatched = []
+    to_hash = []
+    for rel in sorted(local.keys() & device.keys()):
+        if local[rel] != device[rel]:
+            mismatched.append({"path": rel, "reason": "size", "local": local[rel], "device": device[rel]})
+        else:
+            to_hash.append(rel)
+
+    def check(rel):
+        local_digest = file_digest(os.path.join(local_root, rel), mode)
+        device_digest = file_digest(os.path.join(device_root, rel), mode)
+        return rel, local_digest == device_digest
+
+    errors = []
+    total = len(to_hash)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(check, rel) for rel in to_hash]
+        for done, future in enumerate(futures, 1):
+            try:
+                rel, same = future.result()
+                if not same:
+                    mismatched.append({"path": rel, "reason": "content"})
+            except OSError as e:
+                errors.append({"path": to_hash[done - 1], "error": str(e)})
+            if progress:
+                progress(done, total)
+
+    missing_local = sorted(device.keys() - local.keys())
+    missing_device = sorted(local.keys() - device.keys())
+    return {
+        "success": not (mismatched or missing_local or errors),
+        "mode": mode,
+        "checked": len(local.keys() & device.keys()),
+        "matched": total - len([m for m in mismatched if m["reason"] == "content"]) - len(errors),
+        "mismatched": sorted(mismatched, key=lambda m: m["path"]),
+        "missing_local": missing_local,
+        "missing_device": missing_device,
+        "errors": errors,
+    }
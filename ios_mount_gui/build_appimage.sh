@@ -21,6 +21,7 @@ mkdir -p "$APP_DIR/usr/lib/python3/site-packages"
 
 # Copy application files
 cp "$PROJECT_ROOT/main.py" "$APP_DIR/usr/share/ios-mount-gui/"
+cp -r "$PROJECT_ROOT/backend" "$APP_DIR/usr/share/ios-mount-gui/"
 cp "$PROJECT_ROOT/appimage/AppRun" "$APP_DIR/"
 cp "$PROJECT_ROOT/appimage/ios-mount-gui.desktop" "$APP_DIR/"
 cp "$PROJECT_ROOT/appimage/wrapper.py" "$APP_DIR/usr/share/ios-mount-gui/"
@@ -8,8 +8,11 @@ import sys
 import subprocess
 import os
 import threading
-import json
+import time
+import logging
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from collections import OrderedDict
 from datetime import datetime
 
 from PyQt6.QtWidgets import (
@@ -17,11 +20,33 @@ from PyQt6.QtWidgets import (
     QTabWidget, QLabel, QLineEdit, QPushButton, QCheckBox, QRadioButton,
     QButtonGroup, QTextEdit, QListWidget, QListWidgetItem, QFileDialog,
     QMessageBox, QComboBox, QSpinBox, QProgressBar, QListWidgetItem,
-    QScrollArea, QFrame
+    QScrollArea, QFrame, QInputDialog, QListView, QPlainTextEdit, QSplitter,
+    QDialog, QTableView
+)
+from PyQt6.QtCore import (
+    Qt, pyqtSignal, QThread, QSize, QTimer, QAbstractListModel, QAbstractTableModel, QModelIndex,
+    QFileSystemWatcher
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread, QSize
 from PyQt6.QtGui import QFont, QColor, QTextCursor, QIcon
 
+from backend import metrics, tracing
+from backend.backup import AppBackup, paired_mounter
+from backend.commands import ifuse_device_args, parse_app_list, run_command, validate_pairing
+from backend.export import export_archive
+from backend.oplog import OperationLog
+from backend.pairing import PairingCache, mount_with_pairing
+from backend.prefetch import DirectoryPrefetcher
+from backend.preview import BLOCK_SIZE, CACHED_BLOCKS, HEX_ROW, FileWindow, hex_rows, preview_file
+from backend.profiles import DeviceProfileStore, format_gb, parse_pairing_udid
+from backend.service import ServiceError, connect_service
+from backend.snapshots import SnapshotStore
+from backend.stalls import HEARTBEAT_INTERVAL, StallWatchdog, format_stall, threshold_from_env
+from backend.sqlite_inspector import (
+    DEFAULT_PAGE, execute, format_value, is_database, list_tables, open_database, table_query
+)
+from backend.transfer import copy_files
+from backend.verify import verify_trees
+
 # Modern Color Palette
 DARK_BG = "#0a0e27"
 SECONDARY_BG = "#11152d"
@@ -37,6 +62,17 @@ ERROR_COLOR = "#ef4444"
 WARNING_COLOR = "#f59e0b"
 ACCENT_COLOR = "#8b5cf6"
 
+# Command output console: lines kept on screen, batching delay, and spill file rotation
+OUTPUT_MAX_LINES = 2000
+OUTPUT_FLUSH_MS = 100
+OUTPUT_SPILL_BYTES = 5 * 1024 * 1024
+OUTPUT_SPILL_BACKUPS = 3
+
+def execute_command(command, timeout=30):
+    """Run a shell command, returning (success, output)"""
+    result = run_command(command, timeout)
+    return result["success"], result["stdout"] or result["stderr"]
+
 class CommandWorker(QThread):
     """Worker thread for running shell commands"""
     output_signal = pyqtSignal(str)
@@ -46,25 +82,578 @@ class CommandWorker(QThread):
         super().__init__()
         self.command = command
     
+    def run(self):
+        success, output = execute_command(self.command)
+        self.output_signal.emit(output)
+        self.finished_signal.emit(success, output)
+
+class MountWorker(QThread):
+    """Worker thread for ifuse mounts that validates/pairs only when needed"""
+    output_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool, str)
+    
+    def __init__(self, command, pairing_cache, udid, span="mount"):
+        super().__init__()
+        self.command = command
+        self.pairing_cache = pairing_cache
+        self.udid = udid
+        self.span = span
+    
+    def run(self):
+        # Traced here, on the thread doing the work, so --profile captures the mount itself
+        with tracing.span(self.span, "gui"):
+            steps = mount_with_pairing(self.command, run_command, self.pairing_cache, self.udid)
+        for step in steps[:-1]:
+            result = step["result"]
+            self.output_signal.emit(f"{step['step']}: {result['stdout'] or result['stderr']}")
+        result = steps[-1]["result"]
+        output = result["stdout"] or result["stderr"]
+        self.output_signal.emit(output)
+        self.finished_signal.emit(result["success"], output)
+
+class PairingWorker(QThread):
+    """Worker thread that validates pairing, in-process when the bindings load"""
+    output_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool, str)
+    
+    def __init__(self, udid=None):
+        super().__init__()
+        self.udid = udid
+    
+    def run(self):
+        result = validate_pairing(self.udid)
+        output = result["stdout"] or result["stderr"]
+        self.output_signal.emit(output)
+        self.finished_signal.emit(result["success"], output)
+
+class DeviceInfoWorker(QThread):
+    """Worker thread that renders a cached profile, then reconciles it with the device"""
+    cached_signal = pyqtSignal(dict)
+    finished_signal = pyqtSignal(bool, dict)
+    
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+    
     def run(self):
         try:
-            result = subprocess.run(
-                self.command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            output = result.stdout or result.stderr
-            self.output_signal.emit(output)
-            self.finished_signal.emit(result.returncode == 0, output)
-        except subprocess.TimeoutExpired:
-            self.output_signal.emit("Command timeout")
-            self.finished_signal.emit(False, "Command timeout")
+            result = self.service.device_profile()
+            profile = result["profile"]
+            if profile and result["cached"]:
+                self.cached_signal.emit(profile)
+                profile = self.service.device_profile(udid=profile["udid"], refresh=True)["profile"]
+        except (OSError, ServiceError):
+            profile = None
+        self.finished_signal.emit(profile is not None, profile or {})
+
+class AppListWorker(QThread):
+    """Worker thread for the app list, shared with other frontends through the service"""
+    output_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(bool, str)
+    
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+    
+    def run(self):
+        try:
+            with tracing.span("list_apps", "gui"):
+                result = self.service.app_list(refresh=True)
+            success, output = result["success"], result["stdout"] or result["stderr"]
+        except (OSError, ServiceError) as e:
+            success, output = False, str(e)
+        self.output_signal.emit(output)
+        self.finished_signal.emit(success, output)
+
+class UploadWorker(QThread):
+    """Worker thread for copying local files into a mounted container"""
+    progress_signal = pyqtSignal(int)
+    finished_signal = pyqtSignal(list)
+    
+    def __init__(self, sources, dest_dir):
+        super().__init__()
+        self.sources = sources
+        self.dest_dir = dest_dir
+    
+    def run(self):
+        results = copy_files(self.sources, self.dest_dir, progress=self.on_progress)
+        self.finished_signal.emit(results)
+    
+    def on_progress(self, nbytes):
+        metrics.BYTES_TRANSFERRED.inc(nbytes, mount=self.dest_dir, direction="upload")
+        self.progress_signal.emit(nbytes)
+
+class ExportWorker(QThread):
+    """Worker thread for streaming a mounted folder into an archive"""
+    finished_signal = pyqtSignal(bool, str)
+    
+    def __init__(self, root, dest_path, fmt):
+        super().__init__()
+        self.root = root
+        self.dest_path = dest_path
+        self.fmt = fmt
+    
+    def run(self):
+        try:
+            size = export_archive(self.root, self.dest_path, self.fmt, progress=self.on_progress)
+            self.finished_signal.emit(True, f"Exported {size} bytes to {self.dest_path}")
         except Exception as e:
-            self.output_signal.emit(f"Error: {str(e)}")
             self.finished_signal.emit(False, str(e))
+    
+    def on_progress(self, nbytes):
+        metrics.BYTES_TRANSFERRED.inc(nbytes, mount=self.root, direction="export")
+
+class VerifyWorker(QThread):
+    """Worker thread for checking a local copy against the device"""
+    progress_signal = pyqtSignal(int, int)
+    finished_signal = pyqtSignal(dict)
+    
+    def __init__(self, local_root, device_root, mode):
+        super().__init__()
+        self.local_root = local_root
+        self.device_root = device_root
+        self.mode = mode
+    
+    def run(self):
+        try:
+            report = verify_trees(self.local_root, self.device_root, self.mode, progress=self.progress_signal.emit)
+        except Exception as e:
+            report = {"success": False, "error": str(e)}
+        self.finished_signal.emit(report)
+
+class BackupWorker(QThread):
+    """Worker thread for backing up several apps"""
+    progress_signal = pyqtSignal(dict)
+    finished_signal = pyqtSignal(dict)
+    # Byte progress arrives per chunk; the UI only needs a few updates a second
+    PROGRESS_INTERVAL = 0.2
+    
+    def __init__(self, bundle_ids, dest, mount, udid=None):
+        super().__init__()
+        self.bundle_ids = bundle_ids
+        self.dest = dest
+        self.mount = mount
+        self.udid = udid
+        self.last_progress = 0
+    
+    def report(self, state):
+        now = time.monotonic()
+        if now - self.last_progress >= self.PROGRESS_INTERVAL or state["done"] == state["total"]:
+            self.last_progress = now
+            self.progress_signal.emit(state)
+    
+    def run(self):
+        try:
+            summary = AppBackup(self.bundle_ids, self.dest, self.mount, self.udid, progress=self.report).run_all()
+        except Exception as e:
+            summary = {"success": False, "error": str(e)}
+        self.finished_signal.emit(summary)
+
+class SnapshotWorker(QThread):
+    """Worker thread for snapshotting a mounted folder"""
+    finished_signal = pyqtSignal(dict)
+    
+    def __init__(self, store, root, label, mode):
+        super().__init__()
+        self.store = store
+        self.root = root
+        self.label = label
+        self.mode = mode
+    
+    def run(self):
+        try:
+            snapshot = self.store.take(self.root, self.label, self.mode)
+            snapshot.pop("tree")
+        except Exception as e:
+            snapshot = {"error": str(e)}
+        self.finished_signal.emit(snapshot)
+
+class PreviewWorker(QThread):
+    """Worker thread that opens a budgeted window on a file and describes it"""
+    finished_signal = pyqtSignal(str, object, dict)
+    
+    def __init__(self, path, head=None):
+        super().__init__()
+        self.path = path
+        self.head = head
+    
+    def run(self):
+        window = None
+        try:
+            window = FileWindow(self.path, head=self.head)
+            result = preview_file(window)
+        except Exception as e:
+            # Any failure must still reach the pane, or it stays on "Loading..."
+            if window:
+                window.close()
+            window, result = None, {"kind": "error", "error": str(e)}
+        self.finished_signal.emit(self.path, window, result)
+
+class HexBlockWorker(QThread):
+    """Worker thread that reads one block of hexdump rows from a FileWindow"""
+    finished_signal = pyqtSignal(object, int, list)
+    
+    def __init__(self, window, block):
+        super().__init__()
+        self.window = window
+        self.block = block
+    
+    def run(self):
+        try:
+            rows = hex_rows(self.window, self.block * BLOCK_SIZE, BLOCK_SIZE // HEX_ROW)
+        except (OSError, ValueError):
+            # The window was closed because the selection moved on
+            rows = []
+        self.finished_signal.emit(self.window, self.block, rows)
+
+class HexModel(QAbstractListModel):
+    """Hexdump rows of a FileWindow; blocks are read only as rows scroll into view
+    
+    Device blocks are read on a worker, one at a time and the most recently
+    shown first, and their rows replace a placeholder once they arrive.
+    """
+    # Blocks still waiting for the worker; older ones have scrolled away
+    MAX_WANTED = 8
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.window = None
+        self.blocks = OrderedDict()
+        self.wanted = []
+        self.worker = None
+    
+    def set_window(self, window):
+        self.beginResetModel()
+        self.window = window
+        self.blocks.clear()
+        self.wanted = []
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.window is None:
+            return 0
+        return (self.window.size + HEX_ROW - 1) // HEX_ROW
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        block, row = divmod(index.row(), BLOCK_SIZE // HEX_ROW)
+        rows = self.blocks.get(block)
+        if rows is None:
+            if self.window.map is None:
+                self.want(block)
+                return "-- reading from device --"
+            # Memory-mapped local file: no device round trip to wait for
+            rows = hex_rows(self.window, block * BLOCK_SIZE, BLOCK_SIZE // HEX_ROW)
+            self.store(block, rows)
+        return rows[row] if row < len(rows) else "-- preview read budget reached --"
+    
+    def store(self, block, rows):
+        self.blocks[block] = rows
+        if len(self.blocks) > CACHED_BLOCKS:
+            self.blocks.popitem(last=False)
+    
+    def want(self, block):
+        if block in self.wanted:
+            self.wanted.remove(block)
+        self.wanted.append(block)
+        del self.wanted[:-self.MAX_WANTED]
+        self.read_next()
+    
+    def read_next(self):
+        if self.worker is not None or not self.wanted:
+            return
+        self.worker = HexBlockWorker(self.window, self.wanted.pop())
+        self.worker.finished_signal.connect(self.on_block)
+        self.worker.start()
+    
+    def on_block(self, window, block, rows):
+        self.worker = None
+        if window is self.window:
+            self.store(block, rows)
+            first = block * (BLOCK_SIZE // HEX_ROW)
+            last = min(first + BLOCK_SIZE // HEX_ROW, self.rowCount()) - 1
+            self.dataChanged.emit(self.index(first), self.index(last))
+        self.read_next()
+
+class SqliteOpenWorker(QThread):
+    """Worker thread that opens a database read-only, snapshotting it if WAL is in use"""
+    finished_signal = pyqtSignal(object, str, list, str)
+    
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+    
+    def run(self):
+        try:
+            conn, mode = open_database(self.path)
+            self.finished_signal.emit(conn, mode, list_tables(conn), "")
+        except Exception as e:
+            self.finished_signal.emit(None, "", [], str(e))
+
+class SqliteQueryWorker(QThread):
+    """Worker thread that runs a query, or continues one, and fetches the next page"""
+    finished_signal = pyqtSignal(object, list, str)
+    
+    def __init__(self, cursor=None, conn=None, sql=None):
+        super().__init__()
+        self.cursor = cursor
+        self.conn = conn
+        self.sql = sql
+    
+    def run(self):
+        try:
+            cursor = self.cursor if self.sql is None else execute(self.conn, self.sql)
+            page = [[format_value(value) for value in row] for row in cursor.fetchmany(DEFAULT_PAGE)]
+            self.finished_signal.emit(cursor, page, "")
+        except Exception as e:
+            self.finished_signal.emit(self.cursor, [], str(e))
+
+class SqliteResultModel(QAbstractTableModel):
+    """Query results fetched a page at a time as the table view scrolls
+    
+    Queries and pages run on a SqliteQueryWorker, one at a time; a query
+    started while a page is loading waits for it.
+    """
+    error_signal = pyqtSignal(str)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cursor = None
+        self.columns = []
+        self.rows = []
+        self.exhausted = True
+        self.pending = None
+        self.worker = None
+    
+    def run_query(self, conn, sql):
+        self.pending = (conn, sql)
+        self.start_next()
+    
+    def start_next(self, fetch=False):
+        """Start a waiting query, or with fetch the next page of the current one"""
+        if self.worker is not None:
+            return
+        if self.pending is not None:
+            conn, sql = self.pending
+            self.pending = None
+            self.worker = SqliteQueryWorker(conn=conn, sql=sql)
+            self.worker.finished_signal.connect(self.on_query)
+        elif fetch and not self.exhausted:
+            self.worker = SqliteQueryWorker(cursor=self.cursor)
+            self.worker.finished_signal.connect(self.on_page)
+        else:
+            return
+        self.worker.start()
+    
+    def wait(self):
+        """Let a running query or page finish, e.g. before closing its connection"""
+        if self.worker is not None:
+            self.worker.wait()
+    
+    def on_query(self, cursor, page, error):
+        self.worker = None
+        if error:
+            self.error_signal.emit(error)
+        else:
+            self.beginResetModel()
+            self.cursor = cursor
+            # Statements such as PRAGMA x=y return no result set at all
+            self.columns = [column[0] for column in cursor.description or ()]
+            self.rows = page
+            self.exhausted = len(page) < DEFAULT_PAGE
+            self.endResetModel()
+        self.start_next()
+    
+    def on_page(self, cursor, page, error):
+        self.worker = None
+        if cursor is self.cursor:
+            if error:
+                self.exhausted = True
+                self.error_signal.emit(error)
+            else:
+                self.exhausted = len(page) < DEFAULT_PAGE
+                if page:
+                    self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+                    self.rows.extend(page)
+                    self.endInsertRows()
+        self.start_next()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value = self.rows[index.row()][index.column()]
+        return "NULL" if value is None else str(value)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.columns[section] if section < len(self.columns) else None
+        return str(section + 1)
+    
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self.exhausted and self.worker is None
+    
+    def fetchMore(self, parent):
+        self.start_next(fetch=True)
+
+class SqliteInspector(QDialog):
+    """Read-only browser for a database on the mount"""
+    
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"SQLite Inspector - {os.path.basename(path)}")
+        self.resize(900, 600)
+        self.conn = None
+        
+        layout = QVBoxLayout()
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Table:"))
+        self.table_combo = QComboBox()
+        self.table_combo.currentTextChanged.connect(self.show_table)
+        top.addWidget(self.table_combo, 1)
+        self.mode_label = QLabel("Opening...")
+        top.addWidget(self.mode_label)
+        layout.addLayout(top)
+        
+        query_row = QHBoxLayout()
+        self.sql_input = QLineEdit()
+        self.sql_input.setPlaceholderText("SELECT ... (read-only)")
+        self.sql_input.returnPressed.connect(self.run_query)
+        query_row.addWidget(self.sql_input)
+        run_btn = QPushButton("▶ Run")
+        run_btn.setMaximumWidth(100)
+        run_btn.clicked.connect(self.run_query)
+        query_row.addWidget(run_btn)
+        layout.addLayout(query_row)
+        
+        self.model = SqliteResultModel(self)
+        self.model.error_signal.connect(lambda error: QMessageBox.warning(self, "Query Failed", error))
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        layout.addWidget(self.table_view)
+        self.setLayout(layout)
+        
+        self.worker = SqliteOpenWorker(path)
+        self.worker.finished_signal.connect(self.on_opened)
+        self.worker.start()
+    
+    def on_opened(self, conn, mode, tables, error):
+        if error:
+            self.mode_label.setText(f"Error: {error}")
+            return
+        self.conn = conn
+        self.mode_label.setText("in place (immutable)" if mode == "immutable" else "local snapshot (WAL)")
+        self.table_combo.addItems(tables)
+    
+    def show_table(self, table):
+        if table:
+            self.sql_input.setText(table_query(table))
+            self.run_query()
+    
+    def run_query(self):
+        if self.conn is not None:
+            self.model.run_query(self.conn, self.sql_input.text())
+    
+    def closeEvent(self, event):
+        if self.conn is not None:
+            # Stop a long query rather than waiting it out
+            self.conn.interrupt()
+            self.model.wait()
+            self.conn.close()
+        super().closeEvent(event)
+
+class OperationLogModel(QAbstractListModel):
+    """Operation log rows indexed by file offset and read from disk only when shown"""
+    # Formatted rows kept around for scrolling back and forth
+    CACHE_ROWS = 500
+    
+    def __init__(self, log, parent=None):
+        super().__init__(parent)
+        self.log = log
+        self.entries = []
+        self.rows = []
+        self.offset = 0
+        self.operation = None
+        self.status = None
+        self.cache = OrderedDict()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        offset, operation, status = self.entries[self.rows[index.row()]]
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if status == "SUCCESS":
+                return QColor(SUCCESS_COLOR)
+            return QColor(ERROR_COLOR) if status == "FAILED" else None
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        
+        text = self.cache.get(offset)
+        if text is None:
+            try:
+                entry = self.log.read_at(offset)
+                text = f"[{entry['timestamp']}] {operation}: {status}"
+                if entry.get('details'):
+                    text += f"  {entry['details'][:100]}"
+            except (OSError, ValueError, KeyError):
+                text = f"{operation}: {status}"
+            self.cache[offset] = text
+            if len(self.cache) > self.CACHE_ROWS:
+                self.cache.popitem(last=False)
+        return text
+    
+    def entry(self, row):
+        """Full log entry shown at row"""
+        return self.log.read_at(self.entries[self.rows[row]][0])
+    
+    def matches(self, item):
+        _, operation, status = item
+        return (self.operation is None or operation == self.operation) and \
+            (self.status is None or status == self.status)
+    
+    def refresh(self):
+        """Index entries appended since the last call, resetting if the log was cleared"""
+        if self.log.size() < self.offset:
+            self.beginResetModel()
+            self.entries, self.rows, self.offset = [], [], 0
+            self.cache.clear()
+            self.endResetModel()
+        
+        new, self.offset = self.log.scan(self.offset)
+        if not new:
+            return
+        start = len(self.entries)
+        self.entries.extend(new)
+        visible = [i for i in range(start, len(self.entries)) if self.matches(self.entries[i])]
+        if visible:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(visible) - 1)
+            self.rows.extend(visible)
+            self.endInsertRows()
+    
+    def set_filter(self, operation=None, status=None):
+        """Filter on the in-memory index without touching the file"""
+        self.beginResetModel()
+        self.operation, self.status = operation, status
+        self.rows = [i for i, item in enumerate(self.entries) if self.matches(item)]
+        self.endResetModel()
+    
+    def operations(self):
+        return sorted({operation for _, operation, _ in self.entries})
+    
+    def statuses(self):
+        return sorted({status for _, _, status in self.entries})
 
 class IOSMountApp(QMainWindow):
     def __init__(self):
@@ -76,18 +665,42 @@ class IOSMountApp(QMainWindow):
         # Setup logging
         self.app_dir = Path.home() / ".ios_mount_gui"
         self.app_dir.mkdir(exist_ok=True)
-        self.log_file = self.app_dir / "operation_log.json"
+        self.operation_log = OperationLog()
         
         # State
         self.selected_app = None
         self.current_browser_path = None
         self.app_map = {}
+        self.profile_store = DeviceProfileStore()
+        self.pairing_cache = PairingCache()
+        self.current_udid = None
+        self.prefetcher = DirectoryPrefetcher()
+        self.snapshots = SnapshotStore()
+        # Device queries go through the one service on this host
+        self.service = connect_service(profile_store=self.profile_store, pairing_cache=self.pairing_cache)
         
         # Setup UI
         self.setup_styles()
         self.setup_ui()
         
+        # A timer that stops firing means the event loop is blocked
+        self.stall_watchdog = None
+        threshold = threshold_from_env()
+        if threshold:
+            self.stall_watchdog = StallWatchdog(threshold, self.on_ui_stall)
+            self.heartbeat_timer = QTimer(self)
+            self.heartbeat_timer.timeout.connect(self.stall_watchdog.beat)
+            self.heartbeat_timer.start(int(HEARTBEAT_INTERVAL * 1000))
+            QTimer.singleShot(0, self.stall_watchdog.start)
+        
         self.log_operation("Application Started", "SUCCESS")
+        
+        # Show the last known device straight away, then reconcile in the background
+        profile = self.profile_store.latest()
+        if profile:
+            self.render_device_profile(profile, cached=True)
+            self.apply_mount_preferences(profile)
+        self.get_device_info()
     
     def setup_styles(self):
         """Setup modern application stylesheet"""
@@ -125,7 +738,7 @@ class IOSMountApp(QMainWindow):
                 border: none;
                 background-color: {DARK_BG};
             }}
-            QLineEdit, QTextEdit {{
+            QLineEdit, QTextEdit, QPlainTextEdit {{
                 background-color: {TERTIARY_BG};
                 color: {TEXT_PRIMARY};
                 border: 2px solid {BORDER_COLOR};
@@ -134,10 +747,10 @@ class IOSMountApp(QMainWindow):
                 selection-background-color: {PRIMARY_COLOR};
                 font-size: 11pt;
             }}
-            QLineEdit:hover, QTextEdit:hover {{
+            QLineEdit:hover, QTextEdit:hover, QPlainTextEdit:hover {{
                 border: 2px solid {PRIMARY_LIGHT};
             }}
-            QLineEdit:focus, QTextEdit:focus {{
+            QLineEdit:focus, QTextEdit:focus, QPlainTextEdit:focus {{
                 border: 2px solid {PRIMARY_COLOR};
                 background-color: {TERTIARY_BG};
             }}
@@ -411,12 +1024,21 @@ class IOSMountApp(QMainWindow):
         output_label.setFont(QFont("Segoe UI", 12, QFont.Weight.Bold))
         layout.addWidget(output_label)
         
-        self.output_text = QTextEdit()
+        self.output_text = QPlainTextEdit()
         self.output_text.setReadOnly(True)
         self.output_text.setFont(QFont("Courier", 9))
         self.output_text.setMinimumHeight(200)
+        self.output_text.setMaximumBlockCount(OUTPUT_MAX_LINES)
         layout.addWidget(self.output_text)
         
+        # Bursts of output are inserted together instead of one line at a time
+        self.output_pending = []
+        self.output_spill = None
+        self.output_timer = QTimer(self)
+        self.output_timer.setSingleShot(True)
+        self.output_timer.setInterval(OUTPUT_FLUSH_MS)
+        self.output_timer.timeout.connect(self.flush_output)
+        
         layout.addStretch()
         widget.setLayout(layout)
         return widget
@@ -466,7 +1088,7 @@ class IOSMountApp(QMainWindow):
         toolbar.setSpacing(10)
         refresh_btn = QPushButton("🔄 Refresh")
         refresh_btn.setMaximumWidth(120)
-        refresh_btn.clicked.connect(self.browse_path)
+        refresh_btn.clicked.connect(self.refresh_browser)
         toolbar.addWidget(refresh_btn)
         
         self.show_hidden = QCheckBox("Show Hidden Files")
@@ -489,7 +1111,45 @@ class IOSMountApp(QMainWindow):
         
         self.file_list = QListWidget()
         self.file_list.itemDoubleClicked.connect(self.navigate_file)
-        layout.addWidget(self.file_list)
+        self.file_list.currentItemChanged.connect(self.preview_selected)
+        
+        # Preview pane: reads only the head of a file, or the hex rows on screen
+        preview_panel = QWidget()
+        preview_layout = QVBoxLayout()
+        preview_layout.setContentsMargins(0, 0, 0, 0)
+        preview_header = QHBoxLayout()
+        self.preview_label = QLabel("Select a file to preview")
+        self.preview_label.setWordWrap(True)
+        preview_header.addWidget(self.preview_label, 1)
+        self.hex_toggle = QPushButton("Hex")
+        self.hex_toggle.setCheckable(True)
+        self.hex_toggle.setMaximumWidth(80)
+        self.hex_toggle.toggled.connect(self.show_preview_mode)
+        preview_header.addWidget(self.hex_toggle)
+        preview_layout.addLayout(preview_header)
+        
+        self.preview_text = QPlainTextEdit()
+        self.preview_text.setReadOnly(True)
+        self.preview_text.setFont(QFont("Courier", 9))
+        preview_layout.addWidget(self.preview_text)
+        
+        self.hex_model = HexModel(self)
+        self.hex_view = QListView()
+        self.hex_view.setModel(self.hex_model)
+        self.hex_view.setUniformItemSizes(True)
+        self.hex_view.setFont(QFont("Courier", 9))
+        self.hex_view.setVisible(False)
+        preview_layout.addWidget(self.hex_view)
+        preview_panel.setLayout(preview_layout)
+        
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.file_list)
+        splitter.addWidget(preview_panel)
+        splitter.setSizes([400, 400])
+        layout.addWidget(splitter)
+        
+        self.preview_window = None
+        self.preview_worker = None
         
         widget.setLayout(layout)
         return widget
@@ -528,7 +1188,35 @@ class IOSMountApp(QMainWindow):
         browse_btn.clicked.connect(self.browse_app_files)
         btn_layout.addWidget(browse_btn)
         
+        upload_btn = QPushButton("⬇️ Upload Files")
+        upload_btn.clicked.connect(self.upload_app_files)
+        btn_layout.addWidget(upload_btn)
+        
+        export_btn = QPushButton("📦 Export Archive")
+        export_btn.clicked.connect(self.export_app_archive)
+        btn_layout.addWidget(export_btn)
+        
+        verify_btn = QPushButton("🔍 Verify Copy")
+        verify_btn.clicked.connect(self.verify_copy)
+        btn_layout.addWidget(verify_btn)
+        
+        backup_btn = QPushButton("🗄️ Back Up All")
+        backup_btn.clicked.connect(self.backup_all_apps)
+        btn_layout.addWidget(backup_btn)
+        
+        snapshot_btn = QPushButton("📸 Snapshot")
+        snapshot_btn.clicked.connect(self.take_snapshot)
+        btn_layout.addWidget(snapshot_btn)
+        
+        diff_btn = QPushButton("🧾 Diff Snapshots")
+        diff_btn.clicked.connect(self.diff_snapshots)
+        btn_layout.addWidget(diff_btn)
+        
         btn_layout_outer.addLayout(btn_layout)
+        
+        self.transfer_progress = QProgressBar()
+        self.transfer_progress.setVisible(False)
+        btn_layout_outer.addWidget(self.transfer_progress)
         btn_section.setLayout(btn_layout_outer)
         layout.addWidget(btn_section)
         
@@ -588,6 +1276,16 @@ class IOSMountApp(QMainWindow):
         refresh_btn.clicked.connect(self.show_logs)
         btn_layout.addWidget(refresh_btn)
         
+        metrics_btn = QPushButton("📊 Metrics")
+        metrics_btn.setMaximumWidth(120)
+        metrics_btn.clicked.connect(self.show_metrics)
+        btn_layout.addWidget(metrics_btn)
+        
+        stalls_btn = QPushButton("⏱️ Export Stalls")
+        stalls_btn.setMaximumWidth(140)
+        stalls_btn.clicked.connect(self.export_stalls)
+        btn_layout.addWidget(stalls_btn)
+        
         clear_btn = QPushButton("🗑️ Clear Logs")
         clear_btn.setObjectName("dangerBtn")
         clear_btn.setMaximumWidth(120)
@@ -596,6 +1294,22 @@ class IOSMountApp(QMainWindow):
         
         btn_layout.addStretch()
         btn_layout_outer.addLayout(btn_layout)
+        
+        filter_layout = QHBoxLayout()
+        filter_layout.setSpacing(10)
+        filter_layout.addWidget(QLabel("Operation:"))
+        self.log_operation_filter = QComboBox()
+        self.log_operation_filter.addItem("All")
+        self.log_operation_filter.currentIndexChanged.connect(self.apply_log_filter)
+        filter_layout.addWidget(self.log_operation_filter)
+        filter_layout.addWidget(QLabel("Status:"))
+        self.log_status_filter = QComboBox()
+        self.log_status_filter.addItem("All")
+        self.log_status_filter.currentIndexChanged.connect(self.apply_log_filter)
+        filter_layout.addWidget(self.log_status_filter)
+        filter_layout.addStretch()
+        btn_layout_outer.addLayout(filter_layout)
+        
         btn_section.setLayout(btn_layout_outer)
         layout.addWidget(btn_section)
         
@@ -604,11 +1318,27 @@ class IOSMountApp(QMainWindow):
         logs_label.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
         layout.addWidget(logs_label)
         
+        # Only visible rows are read from disk, so the full history stays cheap
+        self.log_model = OperationLogModel(self.operation_log, self)
+        self.logs_view = QListView()
+        self.logs_view.setModel(self.log_model)
+        self.logs_view.setUniformItemSizes(True)
+        self.logs_view.setFont(QFont("Courier", 9))
+        self.logs_view.clicked.connect(self.show_log_entry)
+        layout.addWidget(self.logs_view)
+        
         self.logs_text = QTextEdit()
         self.logs_text.setReadOnly(True)
         self.logs_text.setFont(QFont("Courier", 9))
+        self.logs_text.setMaximumHeight(140)
         layout.addWidget(self.logs_text)
         
+        # Follow entries written by this window and by the backend server
+        self.log_watcher = QFileSystemWatcher([str(self.operation_log.path.parent)], self)
+        self.log_watcher.directoryChanged.connect(self.show_logs)
+        self.log_watcher.fileChanged.connect(self.show_logs)
+        self.show_logs()
+        
         widget.setLayout(layout)
         return widget
     
@@ -617,32 +1347,70 @@ class IOSMountApp(QMainWindow):
     def log_operation(self, operation, status, details=""):
         """Log operation to file"""
         try:
-            logs = []
-            if self.log_file.exists():
-                logs = json.load(open(self.log_file))
-            
-            logs.append({
-                "timestamp": datetime.now().isoformat(),
-                "operation": operation,
-                "status": status,
-                "details": details
-            })
-            
-            with open(self.log_file, 'w') as f:
-                json.dump(logs[-100:], f, indent=2)
+            # Appended here rather than through the service: the log is safe to
+            # share between processes, and a socket call could block the GUI
+            self.operation_log.append(operation, status, details)
+            self.show_logs()
         except:
             pass
     
     def append_output(self, text):
         """Append to output with timestamp"""
-        self.output_text.insertPlainText(f"[{datetime.now().strftime('%H:%M:%S')}] {text}\n")
+        text = text.rstrip("\n")
+        self.output_pending.append(f"[{datetime.now().strftime('%H:%M:%S')}] {text}")
+        if not self.output_timer.isActive():
+            self.output_timer.start()
+    
+    def flush_output(self):
+        """Insert pending output in one go, spilling lines the console will drop"""
+        if not self.output_pending:
+            return
+        lines = "\n".join(self.output_pending).split("\n")
+        self.output_pending = []
+        
+        document = self.output_text.document()
+        current = 0 if document.isEmpty() else document.blockCount()
+        dropped = lines[:-OUTPUT_MAX_LINES]
+        lines = lines[-OUTPUT_MAX_LINES:]
+        excess = min(current + len(lines) - OUTPUT_MAX_LINES, current)
+        trimmed = []
+        block = document.firstBlock()
+        for _ in range(max(excess, 0)):
+            trimmed.append(block.text())
+            block = block.next()
+        self.spill_output(trimmed + dropped)
+        
+        self.output_text.appendPlainText("\n".join(lines))
         self.output_text.moveCursor(QTextCursor.MoveOperation.End)
     
+    def spill_output(self, lines):
+        """Keep lines trimmed from the console in a rolling file"""
+        if not lines:
+            return
+        if self.output_spill is None:
+            handler = RotatingFileHandler(
+                self.app_dir / "output.log", maxBytes=OUTPUT_SPILL_BYTES, backupCount=OUTPUT_SPILL_BACKUPS
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.output_spill = logging.getLogger("ios_mount_gui.output")
+            self.output_spill.propagate = False
+            self.output_spill.setLevel(logging.INFO)
+            self.output_spill.addHandler(handler)
+        self.output_spill.info("\n".join(lines))
+    
     def run_command(self, command, description, callback=None):
         """Run command in thread"""
+        self.start_worker(CommandWorker(command), description, callback)
+    
+    def run_mount(self, command, description, callback=None, span="mount"):
+        """Run an ifuse mount in thread, pairing first only if needed"""
+        self.start_worker(MountWorker(command, self.pairing_cache, self.current_udid, span), description, callback)
+    
+    def start_worker(self, worker, description, callback=None):
+        """Start a command-style worker and route its output"""
         self.status_label.setText(f"Running: {description}...")
         
-        self.worker = CommandWorker(command)
+        self.worker = worker
         self.worker.output_signal.connect(self.append_output)
         self.worker.finished_signal.connect(
             lambda success, output: self.on_command_finished(success, description, output, callback)
@@ -667,22 +1435,38 @@ class IOSMountApp(QMainWindow):
             self.mount_point.setText(path)
     
     def check_device(self):
-        self.run_command("idevicepair validate", "Check Device")
+        self.start_worker(PairingWorker(), "Check Device", self.record_pairing)
     
     def pair_device(self):
-        self.run_command("idevicepair pair", "Pair Device")
+        self.run_command("idevicepair pair", "Pair Device", self.record_pairing)
+    
+    def record_pairing(self, success, output):
+        """Remember the pairing outcome in the device profile"""
+        udid = parse_pairing_udid(output) or self.current_udid
+        if udid:
+            self.profile_store.update(udid, paired=int(success))
+            self.pairing_cache.observe_pairing(udid, {"success": success, "stdout": output, "stderr": ""})
     
     def mount_device(self):
         mount_point = self.mount_point.text()
-        cmd = f"ifuse {mount_point}"
-        if self.mode_group.checkedId() == 1:
+        mode = "ro" if self.mode_group.checkedId() == 1 else "rw"
+        cmd = f"ifuse{ifuse_device_args(self.current_udid)} {mount_point}"
+        if mode == "ro":
             cmd += " -o ro"
         cmd += " -o allow_other"
-        self.run_command(cmd, "Mount Device")
+        # Listings of the empty mount point directory must not outlive the mount
+        self.prefetcher.invalidate(mount_point)
+        
+        def callback(success, output):
+            if success and self.current_udid:
+                self.profile_store.update(self.current_udid, mount_point=mount_point, mount_mode=mode)
+        
+        self.run_mount(cmd, "Mount Device", callback)
     
     def unmount_device(self):
         mount_point = self.mount_point.text()
-        self.run_command(f"fusermount -u {mount_point}", "Unmount Device")
+        self.run_command(f"fusermount -u {mount_point}", "Unmount Device",
+                         lambda success, output: self.prefetcher.invalidate(mount_point))
     
     def open_folder(self):
         mount_point = self.mount_point.text()
@@ -692,42 +1476,126 @@ class IOSMountApp(QMainWindow):
     # === Device Info ===
     
     def get_device_info(self):
-        def callback(success, output):
-            if success:
-                result = subprocess.run("idevice_id -l", shell=True, capture_output=True, text=True)
-                device_id = result.stdout.strip().split('\n')[0] if result.stdout else "Unknown"
-                
-                info = f"Device UDID: {device_id}\n\n"
-                for flag, label in [("DeviceClass", "Class"), ("ProductType", "Type"), ("ProductVersion", "Version")]:
-                    result = subprocess.run(f"ideviceinfo -u {device_id} -k {flag}", shell=True, capture_output=True, text=True)
-                    if result.returncode == 0:
-                        info += f"{label}: {result.stdout.strip()}\n"
-                
-                self.device_info.setText(info)
-        
-        self.run_command("idevice_id -l", "Get Device Info", callback)
+        self.status_label.setText("Running: Get Device Info...")
+        self.device_worker = DeviceInfoWorker(self.service)
+        self.device_worker.cached_signal.connect(lambda profile: self.render_device_profile(profile, cached=True))
+        self.device_worker.finished_signal.connect(self.on_device_info_finished)
+        self.device_worker.start()
+    
+    def on_device_info_finished(self, success, profile):
+        """Render the reconciled profile"""
+        if success:
+            self.current_udid = profile["udid"]
+            self.render_device_profile(profile)
+        else:
+            latest = self.profile_store.latest()
+            if latest:
+                self.render_device_profile(latest, cached=True, note="device not connected")
+        self.on_command_finished(success, "Get Device Info", profile.get("udid", "No device found"))
+    
+    def render_device_profile(self, profile, cached=False, note="refreshing..."):
+        """Show a stored device profile in the Device Info tab"""
+        info = f"Device UDID: {profile['udid']}\n\n"
+        for key, label in [("name", "Name"), ("device_class", "Class"), ("product_type", "Type"), ("ios_version", "Version")]:
+            if profile.get(key):
+                info += f"{label}: {profile[key]}\n"
+        if profile.get("total_capacity"):
+            info += f"Storage: {format_gb(profile.get('free_capacity'))} free of {format_gb(profile['total_capacity'])}\n"
+        if profile.get("paired") is not None:
+            info += f"Paired: {'Yes' if profile['paired'] else 'No'}\n"
+        if cached:
+            last_seen = datetime.fromtimestamp(profile["last_seen"]).strftime('%Y-%m-%d %H:%M')
+            info += f"\n(cached, last seen {last_seen} - {note})\n"
+        self.device_info.setText(info)
+    
+    def apply_mount_preferences(self, profile):
+        """Restore the mount point and mode last used with this device"""
+        if profile.get("mount_point"):
+            self.mount_point.setText(profile["mount_point"])
+        if profile.get("mount_mode"):
+            self.mode_group.button(1 if profile["mount_mode"] == "ro" else 0).setChecked(True)
     
     # === File Browser ===
     
     def browse_path(self):
         """Browse current path"""
-        mount_point = self.mount_point.text()
-        self.current_browser_path = mount_point
-        self.browser_path.setText(mount_point)
-        
-        self.file_list.clear()
-        
-        try:
-            items = os.listdir(mount_point)
-            if not self.show_hidden.isChecked():
-                items = [i for i in items if not i.startswith('.')]
+        with tracing.span("browse_path", "gui"):
+            mount_point = self.mount_point.text()
+            self.current_browser_path = mount_point
+            self.browser_path.setText(mount_point)
             
-            for item in sorted(items):
-                full_path = os.path.join(mount_point, item)
-                prefix = "[DIR]  " if os.path.isdir(full_path) else "[FILE] "
-                self.file_list.addItem(prefix + item)
-        except Exception as e:
-            self.file_list.addItem(f"Error: {str(e)}")
+            self.file_list.clear()
+            
+            try:
+                entries = self.prefetcher.list_dir(mount_point)
+                if not self.show_hidden.isChecked():
+                    entries = [e for e in entries if not e[0].startswith('.')]
+                
+                for name, is_dir, size in entries:
+                    prefix = "[DIR]  " if is_dir else "[FILE] "
+                    self.file_list.addItem(prefix + name)
+                metrics.ENTRIES_LISTED.inc(len(entries), mount=self.find_mount_root(mount_point))
+                # Warm the folders the user is likely to open next
+                self.prefetcher.prefetch_children(mount_point, entries)
+            except Exception as e:
+                self.file_list.addItem(f"Error: {str(e)}")
+    
+    def refresh_browser(self):
+        """Re-read the current folder from the device, bypassing the prefetch cache"""
+        self.prefetcher.invalidate(self.mount_point.text())
+        self.browse_path()
+    
+    def preview_selected(self, item):
+        """Preview the selected file in the background"""
+        if item is None or not item.text().startswith("[FILE]"):
+            return
+        path = os.path.join(self.current_browser_path, item.text()[7:])
+        self.preview_label.setText(f"Loading {os.path.basename(path)}...")
+        self.preview_worker = PreviewWorker(path, self.prefetcher.head(path))
+        self.preview_worker.finished_signal.connect(self.on_preview_finished)
+        self.preview_worker.start()
+    
+    def on_preview_finished(self, path, window, result):
+        """Show a preview unless the selection has moved on"""
+        current = self.file_list.currentItem()
+        if current is None or os.path.join(self.current_browser_path, current.text()[7:]) != path:
+            if window:
+                window.close()
+            return
+        if self.preview_window:
+            self.preview_window.close()
+        self.preview_window = window
+        self.hex_model.set_window(window)
+        
+        name = os.path.basename(path)
+        if result["kind"] == "error":
+            self.preview_label.setText(f"{name}: {result['error']}")
+            self.preview_text.setPlainText("")
+            return
+        
+        summary = f"{name} - {result['kind']}, {result['size']:,} bytes"
+        if result["kind"] == "image":
+            summary += f", {result['format']} {result['width']}x{result['height']}"
+        self.preview_label.setText(summary)
+        text = result.get("text")
+        binary = text is None and result["kind"] == "binary"
+        if text is None:
+            text = "No text preview; use Hex to inspect the contents"
+        elif result["truncated"]:
+            text += "\n\n[... preview truncated ...]"
+        self.preview_text.setPlainText(text)
+        self.show_preview_mode(self.hex_toggle.isChecked() or binary)
+    
+    def show_preview_mode(self, hex_mode):
+        self.preview_text.setVisible(not hex_mode)
+        self.hex_view.setVisible(hex_mode)
+    
+    def find_mount_root(self, path):
+        """Walk up from path to the mount point containing it"""
+        path = os.path.abspath(path)
+        while not os.path.ismount(path) and path != os.path.dirname(path):
+            path = os.path.dirname(path)
+        return path
     
     def navigate_file(self, item):
         """Navigate to file/folder"""
@@ -737,40 +1605,27 @@ class IOSMountApp(QMainWindow):
             new_path = os.path.join(self.current_browser_path, folder_name)
             self.mount_point.setText(new_path)
             self.browse_path()
+        elif text.startswith("[FILE]") and is_database(text[7:]):
+            SqliteInspector(os.path.join(self.current_browser_path, text[7:]), self).show()
     
     # === Apps ===
     
     def list_apps(self):
         def callback(success, output):
             if success:
-                self.apps_list.clear()
-                self.app_map = {}
-                
-                for line in output.split('\n'):
-                    if not line.strip():
-                        continue
-                    
-                    bundle_id = None
-                    display_name = line.strip()
-                    
-                    if '(' in line and ')' in line:
-                        bundle_id = line.split('(')[1].split(')')[0]
-                    elif line.startswith('"') and '","' in line:
-                        parts = [p.strip('"').strip() for p in line.split('","')]
-                        if len(parts) >= 3:
-                            bundle_id = parts[0]
-                            app_name = parts[2]
-                            display_name = f"{app_name} ({bundle_id})"
-                        elif len(parts) >= 1:
-                            bundle_id = parts[0]
-                    else:
-                        bundle_id = line.strip()
-                    
-                    if bundle_id:
-                        self.app_map[display_name] = bundle_id
-                        self.apps_list.addItem(display_name)
-        
-        self.run_command("ifuse --list-apps", "List Apps", callback)
+                self.populate_apps(output)
+        
+        self.start_worker(AppListWorker(self.service), "List Apps", callback)
+    
+    def populate_apps(self, output):
+        """Fill the apps list from ifuse --list-apps output"""
+        with tracing.span("populate_apps", "gui"):
+            self.apps_list.clear()
+            self.app_map = {}
+            
+            for display_name, bundle_id in parse_app_list(output):
+                self.app_map[display_name] = bundle_id
+                self.apps_list.addItem(display_name)
     
     def select_app_from_list(self, item):
         """Select app from list"""
@@ -781,6 +1636,12 @@ class IOSMountApp(QMainWindow):
             self.selected_app = {"name": app_name, "bundle_id": bundle_id}
             self.selected_app_label.setText(f"{app_name}\n({bundle_id})")
     
+    def get_app_mount_point(self):
+        """Mount point used for the selected app's documents"""
+        app_name = self.selected_app["name"].split('(')[0].strip()
+        safe_name = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in app_name)
+        return os.path.expanduser(f"~/iPhone_Apps/{safe_name}")
+    
     def mount_app(self):
         """Mount selected app"""
         if not self.selected_app:
@@ -788,18 +1649,17 @@ class IOSMountApp(QMainWindow):
             return
         
         bundle_id = self.selected_app["bundle_id"]
-        app_name = self.selected_app["name"].split('(')[0].strip()
-        safe_name = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in app_name)
-        mount_point = os.path.expanduser(f"~/iPhone_Apps/{safe_name}")
+        mount_point = self.get_app_mount_point()
         
         os.makedirs(mount_point, exist_ok=True)
-        cmd = f"ifuse --documents {bundle_id} \"{mount_point}\""
+        self.prefetcher.invalidate(mount_point)
+        cmd = f"ifuse{ifuse_device_args(self.current_udid)} --documents {bundle_id} \"{mount_point}\""
         
         def callback(success, output):
             if success:
                 QMessageBox.information(self, "Success", f"App mounted at:\n{mount_point}")
         
-        self.run_command(cmd, "Mount App", callback)
+        self.run_mount(cmd, "Mount App", callback, span="mount_app")
     
     def browse_app_files(self):
         """Browse app files"""
@@ -807,42 +1667,357 @@ class IOSMountApp(QMainWindow):
             QMessageBox.warning(self, "No Selection", "Please mount an app first")
             return
         
-        app_name = self.selected_app["name"].split('(')[0].strip()
-        safe_name = "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in app_name)
-        mount_point = os.path.expanduser(f"~/iPhone_Apps/{safe_name}")
+        mount_point = self.get_app_mount_point()
         
         if os.path.exists(mount_point):
             subprocess.Popen(f"xdg-open {mount_point}", shell=True, stderr=subprocess.DEVNULL)
         else:
             QMessageBox.warning(self, "Not Mounted", f"App not mounted yet. Mount the app first.")
     
+    def upload_app_files(self):
+        """Upload local files into the mounted app's Documents folder"""
+        if not self.selected_app:
+            QMessageBox.warning(self, "No Selection", "Please mount an app first")
+            return
+        
+        mount_point = self.get_app_mount_point()
+        if not os.path.ismount(mount_point):
+            QMessageBox.warning(self, "Not Mounted", "App not mounted yet. Mount the app first.")
+            return
+        
+        sources, _ = QFileDialog.getOpenFileNames(self, "Select Files to Upload")
+        if not sources:
+            return
+        
+        total = sum(os.path.getsize(source) for source in sources)
+        self.transfer_done = 0
+        self.transfer_total = max(total, 1)
+        self.transfer_progress.setRange(0, 1000)
+        self.transfer_progress.setValue(0)
+        self.transfer_progress.setVisible(True)
+        self.status_label.setText(f"Uploading {len(sources)} file(s)...")
+        
+        self.upload_worker = UploadWorker(sources, mount_point)
+        self.upload_worker.progress_signal.connect(self.on_transfer_progress)
+        self.upload_worker.finished_signal.connect(self.on_upload_finished)
+        self.upload_worker.start()
+    
+    def export_app_archive(self):
+        """Export the mounted app's Documents folder as a zip or tar"""
+        if not self.selected_app:
+            QMessageBox.warning(self, "No Selection", "Please mount an app first")
+            return
+        
+        mount_point = self.get_app_mount_point()
+        if not os.path.ismount(mount_point):
+            QMessageBox.warning(self, "Not Mounted", "App not mounted yet. Mount the app first.")
+            return
+        
+        default_path = os.path.expanduser(f"~/{os.path.basename(mount_point)}.zip")
+        dest_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Archive", default_path, "Zip Archive (*.zip);;Tar Archive (*.tar)"
+        )
+        if not dest_path:
+            return
+        fmt = "tar" if dest_path.endswith(".tar") else "zip"
+        
+        self.transfer_progress.setRange(0, 0)
+        self.transfer_progress.setVisible(True)
+        self.status_label.setText("Running: Export Archive...")
+        
+        self.export_worker = ExportWorker(mount_point, dest_path, fmt)
+        self.export_worker.finished_signal.connect(self.on_export_finished)
+        self.export_worker.start()
+    
+    def on_export_finished(self, success, output):
+        """Report export result"""
+        self.transfer_progress.setVisible(False)
+        self.on_command_finished(success, "Export Archive", output)
+        self.append_output(output)
+    
+    def verify_copy(self):
+        """Compare a local copy with the mounted app, or the device mount if no app is mounted"""
+        device_root = self.get_app_mount_point() if self.selected_app else self.mount_point.text()
+        if not os.path.ismount(device_root):
+            QMessageBox.warning(self, "Not Mounted", "Mount the app or device first.")
+            return
+        
+        local_root = QFileDialog.getExistingDirectory(self, "Select Local Copy")
+        if not local_root:
+            return
+        mode, ok = QInputDialog.getItem(
+            self, "Verify Copy", "Mode:", ["Full (hash every byte)", "Sampled (size, head, tail, random blocks)"], 0, False
+        )
+        if not ok:
+            return
+        mode = "sampled" if mode.startswith("Sampled") else "full"
+        
+        self.transfer_progress.setRange(0, 0)
+        self.transfer_progress.setVisible(True)
+        self.status_label.setText("Running: Verify Copy...")
+        
+        self.verify_worker = VerifyWorker(local_root, device_root, mode)
+        self.verify_worker.progress_signal.connect(self.on_verify_progress)
+        self.verify_worker.finished_signal.connect(self.on_verify_finished)
+        self.verify_worker.start()
+    
+    def on_verify_progress(self, done, total):
+        self.transfer_progress.setRange(0, total)
+        self.transfer_progress.setValue(done)
+    
+    def on_verify_finished(self, report):
+        """Report verification results"""
+        self.transfer_progress.setVisible(False)
+        if "error" in report:
+            self.on_command_finished(False, "Verify Copy", report["error"])
+            self.append_output(f"Verify failed: {report['error']}")
+            return
+        
+        summary = (
+            f"{report['matched']} matched, {len(report['mismatched'])} mismatched, "
+            f"{len(report['missing_local'])} missing locally, {len(report['missing_device'])} only local"
+        )
+        self.append_output(f"Verify ({report['mode']}): {summary}")
+        for item in report["mismatched"]:
+            self.append_output(f"  MISMATCH ({item['reason']}): {item['path']}")
+        for path in report["missing_local"]:
+            self.append_output(f"  MISSING: {path}")
+        for item in report["errors"]:
+            self.append_output(f"  ERROR: {item['path']}: {item['error']}")
+        self.on_command_finished(report["success"], "Verify Copy", summary)
+        QMessageBox.information(self, "Verify Copy", summary)
+    
+    def backup_all_apps(self):
+        """Copy every listed app's Documents folder into a local folder"""
+        bundle_ids = list(dict.fromkeys(self.app_map.values()))
+        if not bundle_ids:
+            QMessageBox.warning(self, "No Apps", "Refresh the app list first")
+            return
+        dest = QFileDialog.getExistingDirectory(self, "Select Backup Folder")
+        if not dest:
+            return
+        
+        self.transfer_progress.setRange(0, len(bundle_ids))
+        self.transfer_progress.setValue(0)
+        self.transfer_progress.setVisible(True)
+        self.status_label.setText(f"Backing up {len(bundle_ids)} app(s)...")
+        
+        mount = paired_mounter(self.pairing_cache, self.current_udid)
+        self.backup_worker = BackupWorker(bundle_ids, dest, mount, self.current_udid)
+        self.backup_worker.progress_signal.connect(self.on_backup_progress)
+        self.backup_worker.finished_signal.connect(self.on_backup_finished)
+        self.backup_worker.start()
+    
+    def on_backup_progress(self, state):
+        self.transfer_progress.setValue(state["done"])
+        active = [app["bundle_id"] for app in state["apps"] if app["status"] in ("mounting", "copying")]
+        self.status_label.setText(
+            f"Backing up {state['done']}/{state['total']} apps, {state['bytes'] / (1024 * 1024):.1f} MB"
+            + (f" ({', '.join(active)})" if active else "")
+        )
+    
+    def on_backup_finished(self, summary):
+        """Report per-app backup results"""
+        self.transfer_progress.setVisible(False)
+        if "error" in summary:
+            self.on_command_finished(False, "Back Up All", summary["error"])
+            self.append_output(f"Backup failed: {summary['error']}")
+            return
+        
+        succeeded = summary["total"] - len(summary["failed"])
+        text = f"{succeeded}/{summary['total']} apps backed up to {summary['dest']} ({summary['bytes'] / (1024 * 1024):.1f} MB)"
+        self.append_output(f"Back Up All: {text}")
+        for app in summary["apps"]:
+            if app["status"] == "done":
+                self.append_output(f"  OK: {app['bundle_id']} ({app['files']} files, {app['bytes']} bytes)")
+            else:
+                self.append_output(f"  FAILED: {app['bundle_id']}: {app['error']}")
+        self.on_command_finished(summary["success"], "Back Up All", text)
+        QMessageBox.information(self, "Back Up All", text)
+    
+    def snapshot_target(self):
+        """(root, label) of the mounted app, or of the device mount if no app is mounted"""
+        if self.selected_app:
+            return self.get_app_mount_point(), self.selected_app["bundle_id"]
+        return self.mount_point.text(), "device"
+    
+    def take_snapshot(self):
+        """Record the mounted folder's tree so a later snapshot can be diffed against it"""
+        root, label = self.snapshot_target()
+        if not os.path.ismount(root):
+            QMessageBox.warning(self, "Not Mounted", "Mount the app or device first.")
+            return
+        mode, ok = QInputDialog.getItem(
+            self, "Snapshot", "Mode:", ["Metadata (size and modification time)", "Content (hash changed files)"], 0, False
+        )
+        if not ok:
+            return
+        mode = "content" if mode.startswith("Content") else "metadata"
+        
+        self.transfer_progress.setRange(0, 0)
+        self.transfer_progress.setVisible(True)
+        self.status_label.setText("Running: Snapshot...")
+        
+        self.snapshot_worker = SnapshotWorker(self.snapshots, root, label, mode)
+        self.snapshot_worker.finished_signal.connect(self.on_snapshot_finished)
+        self.snapshot_worker.start()
+    
+    def on_snapshot_finished(self, snapshot):
+        """Report snapshot result"""
+        self.transfer_progress.setVisible(False)
+        if "error" in snapshot:
+            self.on_command_finished(False, "Snapshot", snapshot["error"])
+            self.append_output(f"Snapshot failed: {snapshot['error']}")
+            return
+        stats = snapshot["stats"]
+        summary = (
+            f"{snapshot['id']}: {snapshot['files']} files in {snapshot['duration']:.1f}s "
+            f"({stats['reused']} entries reused, {stats['listed']} folders listed)"
+        )
+        self.append_output(f"Snapshot ({snapshot['mode']}): {summary}")
+        self.on_command_finished(True, "Snapshot", summary)
+    
+    def diff_snapshots(self):
+        """Show what changed between two snapshots of the same app"""
+        _, label = self.snapshot_target()
+        ids = [s["id"] for s in self.snapshots.list(label)]
+        if len(ids) < 2:
+            QMessageBox.warning(self, "Diff Snapshots", f"Take at least two snapshots of {label} first.")
+            return
+        old_id, ok = QInputDialog.getItem(self, "Diff Snapshots", "From:", ids, 1, False)
+        if not ok:
+            return
+        new_id, ok = QInputDialog.getItem(self, "Diff Snapshots", "To:", ids, 0, False)
+        if not ok:
+            return
+        
+        report = self.snapshots.diff(old_id, new_id)
+        if report is None:
+            self.append_output("Diff failed: snapshot not found")
+            return
+        summary = (
+            f"{len(report['added'])} added, {len(report['removed'])} removed, "
+            f"{len(report['changed'])} changed ({report['skipped']} unchanged subtrees skipped)"
+        )
+        self.append_output(f"Diff {old_id} -> {new_id}: {summary}")
+        for item in report["added"]:
+            detail = f"{item['files']} files" if "files" in item else f"{item['size']} bytes"
+            self.append_output(f"  ADDED: {item['path']} ({detail})")
+        for item in report["removed"]:
+            detail = f"{item['files']} files" if "files" in item else f"{item['size']} bytes"
+            self.append_output(f"  REMOVED: {item['path']} ({detail})")
+        for item in report["changed"]:
+            self.append_output(
+                f"  CHANGED: {item['path']} ({item['old_size']} -> {item['new_size']} bytes)"
+            )
+        self.status_label.setText(f"Diff: {summary}")
+    
+    def on_transfer_progress(self, nbytes):
+        """Advance the transfer progress bar"""
+        self.transfer_done += nbytes
+        self.transfer_progress.setValue(int(self.transfer_done * 1000 / self.transfer_total))
+    
+    def on_upload_finished(self, results):
+        """Report upload results"""
+        self.transfer_progress.setVisible(False)
+        self.prefetcher.invalidate(self.get_app_mount_point())
+        failed = [r for r in results if not r["success"]]
+        for result in results:
+            if result["success"]:
+                self.append_output(f"Uploaded {os.path.basename(result['source'])} ({result['bytes']} bytes)")
+            else:
+                self.append_output(f"Upload failed for {os.path.basename(result['source'])}: {result['error']}")
+        
+        status = "FAILED" if failed else "SUCCESS"
+        self.status_label.setText(f"Upload Files: {status}")
+        self.log_operation("Upload Files", status, f"{len(results) - len(failed)}/{len(results)} files")
+    
     # === Logs ===
     
     def show_logs(self):
-        """Show logs"""
+        """Pick up new log entries, keeping the view pinned to the bottom when it was there"""
+        path = str(self.operation_log.path)
+        if path not in self.log_watcher.files() and self.operation_log.path.exists():
+            self.log_watcher.addPath(path)
+        
+        scrollbar = self.logs_view.verticalScrollBar()
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        self.log_model.refresh()
+        self.update_log_filters()
+        if at_bottom:
+            self.logs_view.scrollToBottom()
+    
+    def update_log_filters(self):
+        """Offer every operation and status seen so far"""
+        for combo, values in ((self.log_operation_filter, self.log_model.operations()),
+                              (self.log_status_filter, self.log_model.statuses())):
+            known = {combo.itemText(i) for i in range(1, combo.count())}
+            for value in values:
+                if value not in known:
+                    combo.addItem(value)
+    
+    def apply_log_filter(self):
+        operation = self.log_operation_filter.currentText()
+        status = self.log_status_filter.currentText()
+        self.log_model.set_filter(
+            None if operation == "All" else operation,
+            None if status == "All" else status
+        )
+        self.logs_view.scrollToBottom()
+    
+    def show_log_entry(self, index):
+        """Show the full details of the clicked entry"""
         try:
-            if self.log_file.exists():
-                logs = json.load(open(self.log_file))
-                text = ""
-                for log in logs[-50:]:
-                    text += f"[{log['timestamp']}] {log['operation']}: {log['status']}\n"
-                    if log['details']:
-                        text += f"  {log['details'][:100]}\n"
-                self.logs_text.setText(text)
-            else:
-                self.logs_text.setText("No logs yet")
-        except:
-            self.logs_text.setText("Error loading logs")
+            entry = self.log_model.entry(index.row())
+        except (OSError, ValueError):
+            return
+        self.logs_text.setText(
+            f"[{entry['timestamp']}] {entry['operation']}: {entry['status']}\n\n{entry.get('details', '')}"
+        )
+    
+    def show_metrics(self):
+        """Show a summary of in-process metrics"""
+        text = metrics.REGISTRY.summary()
+        hit_rates = metrics.cache_hit_rates()
+        if hit_rates:
+            text += "\n\nCache hit rates:\n"
+            text += "\n".join(f"  {cache}: {rate:.0%}" for cache, rate in sorted(hit_rates.items()))
+        self.logs_text.setText(text)
+    
+    def on_ui_stall(self, stall):
+        """Record a stall reported by the watchdog once the event loop is back"""
+        self.log_operation("UI Stall", "WARNING", format_stall(stall))
+    
+    def export_stalls(self):
+        """Save every recorded UI stall with its stack to a text file"""
+        entries = self.operation_log.read_all(operation="UI Stall")
+        if not entries:
+            QMessageBox.information(self, "Export Stalls", "No UI stalls have been recorded")
+            return
+        dest_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Stalls", os.path.expanduser("~/ios_mount_stalls.txt"), "Text Files (*.txt)"
+        )
+        if not dest_path:
+            return
+        try:
+            with open(dest_path, 'w') as f:
+                for entry in entries:
+                    f.write(f"[{entry['timestamp']}] {entry.get('details', '')}\n\n")
+        except OSError as e:
+            QMessageBox.warning(self, "Export Stalls", str(e))
+            return
+        self.status_label.setText(f"Exported {len(entries)} stall(s) to {dest_path}")
     
     def clear_logs(self):
         """Clear logs"""
         reply = QMessageBox.question(self, "Clear Logs", "Are you sure?")
         if reply == QMessageBox.StandardButton.Yes:
-            self.log_file.write_text("[]")
+            self.operation_log.clear()
             self.show_logs()
 
 def main():
-    app = QApplication(sys.argv)
+    argv = tracing.configure_from_args(sys.argv)
+    app = QApplication(argv)
     
     # Set a style that's guaranteed to be available (Fusion is built-in)
     # This suppresses the "invalid style override 'kvantum'" warning on systems
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+iOS Mount GUI - Command Line Entry Point
+Headless subcommands with JSON output; launches the GUI when none is given
+"""
+
+import argparse
+import json
+import os
+import shlex
+import sys
+
+# Subcommands import their helpers lazily so startup stays well under 100 ms
+# and PyQt6/Flask are never loaded for headless use
+
+def first_udid(args):
+    from backend.commands import list_udids
+    if args.udid:
+        return args.udid
+    udids = list_udids()
+    return udids[0] if udids else None
+
+def cmd_devices(args):
+    from backend.commands import list_udids
+    return {"success": True, "devices": list_udids()}
+
+def cmd_info(args):
+    from backend.commands import run_output
+    from backend.profiles import DeviceProfileStore, missing_fields, profile_to_info, query_device_fields
+
+    udid = first_udid(args)
+    if not udid:
+        return {"success": False, "error": "No device found"}
+    store = DeviceProfileStore()
+    profile = store.get(udid)
+    if profile is None or not args.cached:
+        profile = store.update(udid, **query_device_fields(udid, missing_fields(profile), run_output))
+    return {"success": True, **profile_to_info(profile)}
+
+def cmd_pair(args):
+    from backend.commands import run_command, validate_pairing
+    from backend.profiles import DeviceProfileStore, parse_pairing_udid
+
+    device_arg = f" -u {shlex.quote(args.udid)}" if args.udid else ""
+    if args.validate:
+        result = validate_pairing(args.udid)
+    else:
+        result = run_command(f"idevicepair{device_arg} pair")
+    udid = args.udid or parse_pairing_udid(result["stdout"] + result["stderr"])
+    if udid:
+        DeviceProfileStore().update(udid, paired=int(result["success"]))
+    return result
+
+def mount_command(mount_point, udid=None, bundle_id=None, read_only=False):
+    from backend.commands import ifuse_device_args
+
+    cmd = "ifuse" + ifuse_device_args(udid)
+    if bundle_id:
+        cmd += f" --documents {shlex.quote(bundle_id)}"
+    cmd += f" {shlex.quote(mount_point)}"
+    if read_only:
+        cmd += " -o ro"
+    return cmd
+
+def paired_mount(command, udid):
+    """Mount through the pairing cache, seeded from the stored profile"""
+    from backend.commands import run_command
+    from backend.pairing import PairingCache, mount_with_pairing
+    from backend.profiles import DeviceProfileStore
+
+    cache = PairingCache()
+    store = DeviceProfileStore()
+    profile = store.get(udid) if udid else None
+    if profile and profile["paired"]:
+        cache.mark_trusted(udid)
+    steps = mount_with_pairing(command, run_command, cache, udid)
+    if udid:
+        store.update(udid, paired=int(cache.is_trusted(udid)))
+    return {"success": steps[-1]["result"]["success"], "steps": steps}
+
+def cmd_mount(args):
+    mount_point = os.path.expanduser(args.mount_point)
+    os.makedirs(mount_point, exist_ok=True)
+    udid = first_udid(args)
+    result = paired_mount(mount_command(mount_point, udid, read_only=args.read_only), udid)
+    if result["success"] and udid:
+        from backend.profiles import DeviceProfileStore
+        DeviceProfileStore().update(udid, mount_point=mount_point, mount_mode="ro" if args.read_only else "rw")
+    return {"mount_point": mount_point, **result}
+
+def cmd_unmount(args):
+    from backend.commands import run_command
+    return run_command(f"fusermount -u {shlex.quote(os.path.expanduser(args.mount_point))}")
+
+def cmd_mount_app(args):
+    mount_point = os.path.expanduser(args.mount_point)
+    os.makedirs(mount_point, exist_ok=True)
+    udid = first_udid(args)
+    command = mount_command(mount_point, udid, bundle_id=args.bundle_id)
+    return {"mount_point": mount_point, **paired_mount(command, udid)}
+
+def cmd_list_apps(args):
+    from backend.commands import parse_app_list, run_command
+
+    device_arg = f" -u {shlex.quote(args.udid)}" if args.udid else ""
+    result = run_command(f"ifuse{device_arg} --list-apps")
+    if not result["success"]:
+        return {"success": False, "error": result["stderr"]}
+    apps = [{"name": name, "bundle_id": bundle_id} for name, bundle_id in parse_app_list(result["stdout"])]
+    return {"success": True, "apps": apps}
+
+def summarize_copy(results):
+    failed = [r for r in results if not r["success"]]
+    return {
+        "success": not failed,
+        "files": len(results),
+        "bytes": sum(r["bytes"] for r in results if r["success"]),
+        "failed": failed,
+    }
+
+def cmd_copy(args):
+    from backend.transfer import copy_files, copy_tree
+
+    results = []
+    for source in args.sources:
+        if os.path.isdir(source):
+            target = os.path.join(args.dest, os.path.basename(os.path.normpath(source)))
+            results.extend(copy_tree(source, target, args.workers))
+        else:
+            results.extend(copy_files([source], args.dest, args.workers))
+    return summarize_copy(results)
+
+def cmd_backup(args):
+    import tempfile
+    from backend.commands import run_command
+    from backend.transfer import copy_tree
+
+    udid = first_udid(args)
+    mount_point = tempfile.mkdtemp(prefix="ios-mount-")
+    try:
+        mounted = paired_mount(mount_command(mount_point, udid, bundle_id=args.bundle_id, read_only=True), udid)
+        if not mounted["success"]:
+            return mounted
+        try:
+            results = copy_tree(mount_point, os.path.join(args.dest, args.bundle_id), args.workers)
+        finally:
+            run_command(f"fusermount -u {shlex.quote(mount_point)}")
+        return {"bundle_id": args.bundle_id, **summarize_copy(results)}
+    finally:
+        try:
+            os.rmdir(mount_point)
+        except OSError:
+            pass
+
+def cmd_backup_all(args):
+    from backend.backup import AppBackup, installed_apps
+
+    udid = first_udid(args)
+    apps = installed_apps(args.udid)
+    if apps is None:
+        return {"success": False, "error": "Could not list apps"}
+
+    def progress(state):
+        print(f"\r{state['done']}/{state['total']} apps, {state['bytes'] // (1024 * 1024)} MiB",
+              end="", file=sys.stderr, flush=True)
+
+    backup = AppBackup([bundle_id for _, bundle_id in apps], os.path.expanduser(args.dest),
+                       lambda command: paired_mount(command, udid), udid,
+                       args.concurrency, args.workers, progress=progress)
+    result = backup.run_all()
+    print(file=sys.stderr)
+    return result
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ios-mount-gui", description="Mount and explore iOS devices")
+    parser.add_argument("-u", "--udid", help="Target device UDID (default: first attached)")
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("devices", help="List attached devices").set_defaults(func=cmd_devices)
+
+    p = sub.add_parser("info", help="Show device information")
+    p.add_argument("--cached", action="store_true", help="Answer from the profile store only")
+    p.set_defaults(func=cmd_info)
+
+    p = sub.add_parser("pair", help="Pair with the device")
+    p.add_argument("--validate", action="store_true", help="Only validate the existing pairing")
+    p.set_defaults(func=cmd_pair)
+
+    p = sub.add_parser("mount", help="Mount the device filesystem")
+    p.add_argument("mount_point", nargs="?", default="~/iPhone")
+    p.add_argument("--read-only", action="store_true")
+    p.set_defaults(func=cmd_mount)
+
+    p = sub.add_parser("unmount", help="Unmount a mount point")
+    p.add_argument("mount_point", nargs="?", default="~/iPhone")
+    p.set_defaults(func=cmd_unmount)
+
+    p = sub.add_parser("mount-app", help="Mount an app's Documents folder")
+    p.add_argument("bundle_id")
+    p.add_argument("mount_point")
+    p.set_defaults(func=cmd_mount_app)
+
+    sub.add_parser("list-apps", help="List apps with file sharing").set_defaults(func=cmd_list_apps)
+
+    p = sub.add_parser("copy", help="Copy files or folders")
+    p.add_argument("sources", nargs="+")
+    p.add_argument("dest")
+    p.add_argument("--workers", type=int, default=3)
+    p.set_defaults(func=cmd_copy)
+
+    p = sub.add_parser("backup", help="Copy an app's Documents folder to a local directory")
+    p.add_argument("bundle_id")
+    p.add_argument("dest")
+    p.add_argument("--workers", type=int, default=3)
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("backup-all", help="Copy every file-sharing app's Documents folder")
+    p.add_argument("dest")
+    p.add_argument("--concurrency", type=int, default=2, help="Apps mounted at the same time")
+    p.add_argument("--workers", type=int, default=2, help="Files copied at the same time per app")
+    p.set_defaults(func=cmd_backup_all)
+
+    return parser, sub.choices
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser, subcommands = build_parser()
+    if not any(arg in subcommands or arg in ("-h", "--help") for arg in argv):
+        # No subcommand: start the desktop app, which takes its own flags
+        from main import main as gui_main
+        return gui_main()
+
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 2
+    result = args.func(args)
+    print(json.dumps(result, indent=2))
+    return 0 if result.get("success", True) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())